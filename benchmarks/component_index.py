@@ -0,0 +1,63 @@
+""" Time of the lookups and the changes by ID of the mapping interface of
+the components, with the ID index against the search of the tree.
+
+    python benchmarks/component_index.py [nodes] [lookups]
+"""
+import random
+import sys
+import time
+
+import dash_html_components as html
+
+
+def make_tree(nodes):
+    # Sections of rows of a cell and a text, 4 nodes by row
+    rows = nodes // 4
+    sections = max(rows // 100, 1)
+    return html.Div([
+        html.Section([
+            html.Div(
+                [html.Span('cell', id='cell-{}-{}'.format(section, row)), 'text'], id='row-{}-{}'.format(section, row)
+            )
+            for row in range(rows // sections)
+        ], id='section-{}'.format(section))
+        for section in range(sections)
+    ], id='root')
+
+
+def lookups(tree, ids, search):
+    start = time.perf_counter()
+    for id_ in ids:
+        if search:
+            tree._get_set_or_delete(id_, 'get')  # pylint: disable=protected-access
+        else:
+            tree[id_]  # pylint: disable=pointless-statement
+    return time.perf_counter() - start
+
+
+def changes(tree, ids, search):
+    start = time.perf_counter()
+    for id_ in ids:
+        new = html.Span('new', id=id_)
+        if search:
+            tree._get_set_or_delete(id_, 'set', new)  # pylint: disable=protected-access
+        else:
+            tree[id_] = new
+    return time.perf_counter() - start
+
+
+def main(nodes=50000, count=200):
+    tree = make_tree(nodes)
+    ids = list(tree)
+    print('{} nodes, {} IDs, {} lookups'.format(len(tree) + 1, len(ids), count))
+    sample = random.Random(0).sample([i for i in ids if i.startswith('cell-')], count)
+
+    for label, search in (('search', True), ('index', False)):
+        tree = make_tree(nodes)
+        get_time = lookups(tree, sample, search)
+        set_time = changes(tree, sample, search)
+        print('{:<8} get {:>9.1f}ms  set {:>9.1f}ms'.format(label, get_time * 1000, set_time * 1000))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
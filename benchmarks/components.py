@@ -0,0 +1,57 @@
+""" Construction time and memory of the generated components, the installed
+dash_html_components classes against the same classes generated again by
+dash.development.
+
+    python benchmarks/components.py [components]
+"""
+import sys
+import timeit
+import tracemalloc
+
+import dash_html_components as html
+
+from dash.development._py_components_generation import generate_class
+
+
+def regenerate(component_class):
+    component = component_class()
+    props = {
+        name: {'type': {'name': 'string'}, 'required': False, 'description': ''}
+        for name in component._prop_names  # pylint: disable=protected-access
+    }
+    return generate_class(
+        component._type, props, component_class.__doc__ or '', component._namespace  # pylint: disable=protected-access
+    )
+
+
+def make_cases(components):
+    cases = []
+    for label, td, tr in (
+        ('installed', html.Td, html.Tr),
+        ('generated', regenerate(html.Td), regenerate(html.Tr)),
+    ):
+        cases.extend([
+            (label + ' Td()', lambda td=td: [td() for _ in range(components)]),
+            (label + ' Td(text, id)', lambda td=td: [td('cell', id='c{}'.format(i)) for i in range(components)]),
+            (label + ' Td(wildcard)', lambda td=td: [td('cell', **{'data-row': i}) for i in range(components)]),
+            (label + ' Tr(Td) rows', lambda td=td, tr=tr: [
+                tr([td(i), td('cell', className='cell')]) for i in range(components // 3)
+            ]),
+        ])
+    return cases
+
+
+def main(components=100000):
+    print('{:<28}{:>12}{:>14}'.format('case ({} components)'.format(components), 'time', 'memory'))
+    for label, build in make_cases(components):
+        seconds = min(timeit.repeat(build, number=1, repeat=3))
+        tracemalloc.start()
+        built = build()
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del built
+        print('{:<28}{:>10.1f}ms{:>12.1f}MB'.format(label, seconds * 1000, memory / 1024 / 1024))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,51 @@
+""" Encoding time and size of the JSON encoders of DASH_JSON_ENCODER,
+with and without DASH_JSON_TYPED_ARRAYS.
+
+    python benchmarks/json_encoder.py [points]
+"""
+import sys
+import timeit
+
+import numpy as np
+import plotly.graph_objects as go
+import dash_core_components as dcc
+import dash_html_components as html
+
+from dash._utils import JSON_ENCODERS, TYPED_ARRAY_JSON_ENCODERS, orjson
+
+
+def make_payloads(points):
+    x = np.linspace(0, 100, points)
+    figure = go.Figure([go.Scatter(x=x, y=np.sin(x) + i) for i in range(5)])
+    layout = html.Div([
+        dcc.Graph(id='graph', figure=figure),
+        html.Table([html.Tr([html.Td('{}:{}'.format(row, col)) for col in range(10)]) for row in range(500)]),
+    ])
+    return {
+        'figure': {'response': {'graph': {'figure': figure}}},
+        'arrays': {'response': {'graph': {'figure': {'data': [{'x': x, 'y': np.sin(x) + i} for i in range(5)]}}}},
+        'layout': layout,
+        'table': [{'row': row, 'values': list(range(20))} for row in range(5000)],
+    }
+
+
+def main(points=100000):
+    payloads = make_payloads(points)
+    # The typed encoders directly, whatever the version of the plotly.js of dash_core_components
+    encoders = [
+        (name + ('+typed' if typed_arrays else ''),
+         (TYPED_ARRAY_JSON_ENCODERS if typed_arrays else JSON_ENCODERS)[name])
+        for typed_arrays in (False, True) for name in JSON_ENCODERS if name != 'orjson' or orjson is not None
+    ]
+    print('{:<10}'.format('payload') + ''.join('{:>22}'.format(name) for name, _ in encoders))
+    for payload_name, payload in payloads.items():
+        results = []
+        for _, encode in encoders:
+            size = len(encode(payload))  # warm up
+            seconds = min(timeit.repeat(lambda: encode(payload), number=3, repeat=3)) / 3
+            results.append('{:>10.1f}ms {:>8.0f}KB'.format(seconds * 1000, size / 1024))
+        print('{:<10}'.format(payload_name) + ''.join(results))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
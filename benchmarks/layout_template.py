@@ -0,0 +1,39 @@
+""" Time of the function layouts built and encoded on each call, against the
+copies of a template changed by clone_with().
+
+    python benchmarks/layout_template.py [rows] [calls]
+"""
+import sys
+import timeit
+
+import dash_html_components as html
+
+from dash._utils import to_json
+from dash.development.base_component import clone_with, template
+
+
+def make_layout(rows, title):
+    return html.Div([
+        html.H1(title, id='title'),
+        html.Table([
+            html.Tr([html.Td('cell {}'.format(row), className='cell'), html.Td(row)]) for row in range(rows)
+        ], id='table'),
+    ], id='root')
+
+
+def main(rows=2000, calls=50):
+    layout = template(make_layout(rows, ''))
+    cases = [
+        ('built', lambda: to_json(make_layout(rows, 'Title'))),
+        ('clone_with', lambda: to_json(clone_with(layout, {'title': {'children': 'Title'}}))),
+    ]
+    assert cases[0][1]() == cases[1][1]()
+
+    print('{} rows, {} calls'.format(rows, calls))
+    for label, call in cases:
+        seconds = min(timeit.repeat(call, number=calls, repeat=3)) / calls
+        print('{:<12}{:>10.2f}ms'.format(label, seconds * 1000))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -1,5 +1,7 @@
 from .dash import Dash, no_update  # noqa: F401
 from .views import BaseDashView  # noqa: F401
+from ._utils import RawJSON  # noqa: F401
+from ._memoize import Memoize  # noqa: F401
 from . import dependencies  # noqa: F401
 from . import development  # noqa: F401
 from . import exceptions  # noqa: F401
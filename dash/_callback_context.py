@@ -0,0 +1,77 @@
+from django.utils.functional import cached_property
+
+from ._utils import from_json, inputs_to_dict, split_callback_id
+
+
+class CallbackContext(object):
+    """Request-scoped context of a callback, parsed from the request body
+    when it is first accessed.
+
+    The body is decoded once, by the ``DASH_JSON_DECODER`` setting, and the
+    ``input_values``, ``state_values`` and ``triggered_inputs`` are only built
+    when the callback asks for them.
+    """
+
+    def __init__(self, request):
+        self._request = request
+
+    @cached_property
+    def body(self):
+        return from_json(self._request.body)
+
+    @cached_property
+    def output(self):
+        return self.body['output']
+
+    @cached_property
+    def outputs_list(self):
+        return self.body.get('outputs', []) or split_callback_id(self.output)
+
+    @cached_property
+    def inputs_list(self):
+        return self.body.get('inputs', [])
+
+    @cached_property
+    def states_list(self):
+        return self.body.get('state', [])
+
+    @cached_property
+    def changed_prop_ids(self):
+        return self.body.get('changedPropIds', [])
+
+    @cached_property
+    def input_values(self):
+        return inputs_to_dict(self.inputs_list)
+
+    @cached_property
+    def state_values(self):
+        return inputs_to_dict(self.states_list)
+
+    @cached_property
+    def triggered_inputs(self):
+        input_values = self.input_values
+        return [{'prop_id': x, 'value': input_values.get(x)} for x in self.changed_prop_ids]
+
+
+def callback_context(request):
+    """Get the callback context of the request."""
+    context = getattr(request, 'dash_callback_context', None)
+    if context is None:
+        context = request.dash_callback_context = CallbackContext(request)
+    return context
+
+
+# The attributes of the callback context set on the requests, see set_request_attributes
+REQUEST_ATTRIBUTES = (
+    'output', 'outputs_list', 'inputs_list', 'states_list', 'input_values', 'state_values', 'triggered_inputs',
+)
+
+
+def set_request_attributes(request):
+    """Set the values of the callback context as plain attributes of the
+    request, read by the callbacks as ``self.request.input_values``, ...,
+    before they are called."""
+    context = callback_context(request)
+    for name in REQUEST_ATTRIBUTES:
+        setattr(request, name, getattr(context, name))
+    return context
@@ -0,0 +1,209 @@
+""" Memoization of the callback responses, see ``Dash.callback(memoize=...)``.
+
+The responses are cached by the values of the inputs and the states of the
+callback, encoded to JSON once, in process or in a Django cache shared by
+the workers. Each callback has a generation in the cache, part of the keys
+of its responses, replaced to invalidate them.
+
+With a custom ``DASH_JSON_ENCODER``, the output values are cached as they
+are, and encoded by each response.
+"""
+import hashlib
+import json
+import pickle
+import uuid
+from collections import OrderedDict
+from threading import Lock
+
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+
+from ._utils import JSON_ENCODERS, TYPED_ARRAY_JSON_ENCODERS, json_encoder, typed_figure, RawJSON
+from .exceptions import PreventUpdate
+
+# The cached response of the callbacks raising PreventUpdate
+_PREVENT_UPDATE = "prevent_update"
+
+
+def _builtin_json_encoder():
+    """Get the encoder of the ``DASH_JSON_ENCODER`` setting if it's the
+    ``json`` or the ``orjson`` one, None for custom encoders."""
+    encode = json_encoder()
+    if encode in JSON_ENCODERS.values() or encode in TYPED_ARRAY_JSON_ENCODERS.values():
+        return encode
+    return None
+
+
+class _SizedMemoryCache(LocMemCache):
+    """In-process cache limited by the size of the pickled values too, the
+    least recently used ones dropped first.
+
+    Unlike ``LocMemCache``, its data isn't shared by name.
+    """
+    def __init__(self, max_bytes, params):  # pylint: disable=super-init-not-called
+        BaseCache.__init__(self, params)  # pylint: disable=non-parent-init-called
+        self._cache = OrderedDict()
+        self._expire_info = {}
+        self._lock = Lock()
+        self._max_bytes = max_bytes
+        self._bytes = 0
+
+    def _set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        self._delete(key)
+        if len(value) > self._max_bytes:
+            return
+        super()._set(key, value, timeout)
+        self._bytes += len(value)
+        while self._bytes > self._max_bytes:
+            # The most recently used values are first
+            self._delete(next(reversed(self._cache)))
+
+    def _cull(self):
+        if self._cull_frequency == 0:
+            self._cache.clear()
+            self._expire_info.clear()
+            self._bytes = 0
+        else:
+            for key in list(reversed(self._cache))[:len(self._cache) // self._cull_frequency]:
+                self._delete(key)
+
+    def _delete(self, key):
+        value = self._cache.get(key)
+        if not super()._delete(key):
+            return False
+        self._bytes -= len(value)
+        return True
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        with self._lock:
+            if self._has_expired(key):
+                self._delete(key)
+                raise ValueError("Key '%s' not found" % key)
+            value = pickle.loads(self._cache[key]) + delta
+            expire = self._expire_info[key]
+            self._set(key, pickle.dumps(value, self.pickle_protocol))
+            if key in self._cache:
+                self._expire_info[key] = expire
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._expire_info.clear()
+            self._bytes = 0
+
+
+class Memoize(object):
+    """The memoization of the responses of callbacks, by the values of their
+    inputs and states, for ``Dash.callback(memoize=...)``.
+
+    The memoized callbacks must only depend on these values: the responses
+    are shared by all the users, and the callbacks aren't called for the
+    cached ones, so they don't set the headers and the cookies of the
+    responses either.
+
+    :param timeout: Seconds to keep the responses, None to keep them until
+        they are dropped or invalidated.
+    :param max_bytes: The size of the in-process cache, its least recently
+        used responses being dropped first.
+    :param cache_alias: The Django cache of the responses, shared by the
+        workers, instead of the in-process cache.
+    :param key_prefix: The prefix of the cache keys, to tell apart the apps
+        sharing a Django cache.
+
+    The responses are cached by callback ID and function, so the copies of
+    an app served at other base URLs share them, and their invalidation.
+    """
+    def __init__(self, timeout=300, max_bytes=64 * 1024 * 1024, cache_alias=None, key_prefix=''):
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.cache_alias = cache_alias
+        self.key_prefix = key_prefix
+        self._memory_cache = None if cache_alias else _SizedMemoryCache(
+            max_bytes, {'timeout': timeout, 'max_entries': 2 ** 31}
+        )
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias] if self.cache_alias else self._memory_cache
+
+    def _generation_key(self, callback_id, func):
+        # The same in all the processes, unlike the identity of the function
+        code = getattr(func, '__code__', None)
+        return 'dash-memoize:' + hashlib.md5('{}:{}:{}.{}:{}'.format(
+            self.key_prefix, callback_id, getattr(func, '__module__', ''),
+            getattr(func, '__qualname__', type(func).__qualname__), getattr(code, 'co_firstlineno', ''),
+        ).encode('utf-8')).hexdigest()
+
+    def make_key(self, callback_id, func, args, outputs_list):
+        """Get the cache key of the response of the callback to the values of
+        its inputs and states.
+        """
+        cache = self.cache
+        generation_key = self._generation_key(callback_id, func)
+        generation = cache.get(generation_key)
+        if generation is None:
+            # Never reused, so the responses of the lost generations stay invalid
+            cache.add(generation_key, uuid.uuid4().hex, None)
+            generation = cache.get(generation_key)
+
+        values = json.dumps([args, outputs_list], sort_keys=True, separators=(',', ':'), default=str)
+        return '{}:{}:{}'.format(
+            generation_key, generation, hashlib.sha256(values.encode('utf-8')).hexdigest()
+        )
+
+    def invalidate(self, callback_id, func):
+        """Invalidate the cached responses of the callback."""
+        self.cache.set(self._generation_key(callback_id, func), uuid.uuid4().hex, None)
+
+    def get(self, key):
+        """Get the cached response, as by ``Dash.update_component``.
+
+        :return: ``(None, response)``, the output values being only in the
+            response, or None when not cached.
+        :raise PreventUpdate: When the cached callback prevented the update.
+        """
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+        if cached == _PREVENT_UPDATE:
+            raise PreventUpdate
+        encoded, cached = cached
+        if not encoded:
+            return None, {"response": cached, "multi": True}
+        response = {
+            component_id: {prop: RawJSON(content) for prop, content in props.items()}
+            for component_id, props in cached.items()
+        }
+        return None, {"response": response, "multi": True}
+
+    def set(self, key, result):
+        """Cache the result of ``Dash.update_component``, None when the
+        callback prevented the update.
+
+        The output values of the response are replaced by their JSON, so
+        they aren't encoded again, unless the JSON encoder is a custom one.
+        """
+        if result is None:
+            self.cache.set(key, _PREVENT_UPDATE, self.timeout)
+            return
+
+        encode = _builtin_json_encoder()
+        if encode is None:
+            self.cache.set(key, (False, result[1]["response"]), self.timeout)
+            return
+
+        typed_arrays = encode in TYPED_ARRAY_JSON_ENCODERS.values()
+        cached = {}
+        for component_id, props in result[1]["response"].items():
+            cached[component_id] = contents = {}
+            for prop, value in props.items():
+                if typed_arrays and prop == "figure" and isinstance(value, dict):
+                    # Encoded on its own, without the "figure" key telling it's a figure
+                    value = typed_figure(value)
+                contents[prop] = encode(value)
+                props[prop] = RawJSON(contents[prop])
+        self.cache.set(key, (True, cached), self.timeout)
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
+import os
 import shlex
 import sys
 import uuid
@@ -9,10 +10,28 @@ import subprocess
 import logging
 import io
 import json
-from functools import wraps
+import base64
+import math
+import re
+import threading
+from functools import wraps, lru_cache
+from importlib import import_module
 import future.utils as utils
+import plotly
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from . import exceptions
 
+try:
+    from asgiref.sync import async_to_sync, sync_to_async
+except ImportError:  # Django < 3.0
+    async_to_sync = sync_to_async = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger()
 
 # py2/3 json.dumps-compatible strings - these are equivalent in py3, not in py2
@@ -42,6 +61,454 @@ def format_tag(tag_name, attributes, inner="", closed=False, opened=False):
     )
 
 
+# numpy dtypes of the plotly.js typed arrays
+_TYPED_ARRAY_DTYPES = {
+    "int8": "i1",
+    "uint8": "u1",
+    "int16": "i2",
+    "uint16": "u2",
+    "int32": "i4",
+    "uint32": "u4",
+    "float32": "f4",
+    "float64": "f8",
+}
+
+
+def to_typed_array(value):
+    """Get the plotly.js typed array spec, ``{dtype, bdata, shape}`` with the
+    little-endian bytes of the array in base64, of a numpy array.
+
+    :return: The spec, or ``None`` if the array has no typed array dtype.
+    """
+    np = sys.modules.get("numpy")
+    if np is None or not isinstance(value, np.ndarray) or value.size == 0:
+        return None
+
+    if value.dtype.kind in "iu" and value.dtype.itemsize == 8:
+        # int64 isn't a typed array of the browsers, use int32 if it fits
+        info = np.iinfo(value.dtype.kind + "4")
+        if value.min() < info.min or value.max() > info.max:
+            return None
+        value = value.astype(value.dtype.kind + "4")
+
+    dtype = _TYPED_ARRAY_DTYPES.get(value.dtype.name)
+    if dtype is None:
+        return None
+
+    value = np.ascontiguousarray(value, dtype=value.dtype.newbyteorder("<"))
+    spec = {"dtype": dtype, "bdata": base64.b64encode(value.data).decode("ascii")}
+    if value.ndim > 1:
+        spec["shape"] = ", ".join(str(n) for n in value.shape)
+    return spec
+
+
+def _typed_trace(trace):
+    typed = {}
+    for key, value in trace.items():
+        if isinstance(value, dict):
+            # marker, line, ...
+            value = _typed_trace(value)
+        else:
+            spec = to_typed_array(value)
+            if spec is not None:
+                value = spec
+        typed[key] = value
+    return typed
+
+
+def typed_figure(figure):
+    """Get a copy of the figure dict with the numpy arrays of its traces
+    encoded to typed array specs, the figure itself if it has no data.
+    """
+    data = figure.get("data") if isinstance(figure, dict) else None
+    if not isinstance(data, (list, tuple)):
+        return figure
+    return dict(figure, data=[_typed_trace(trace) if isinstance(trace, dict) else trace for trace in data])
+
+
+def _is_figure(value):
+    # Not imported without figure objects
+    basedatatypes = sys.modules.get("plotly.basedatatypes")
+    return basedatatypes is not None and isinstance(value, basedatatypes.BaseFigure)
+
+
+def _typed_figures(value):
+    """Get the JSON data with its figures, the values of the ``figure`` keys
+    like the ``figure`` props and outputs, as by typed_figure. Only the
+    containers of the figures are copied.
+    """
+    if isinstance(value, dict):
+        typed = None
+        for key, item in value.items():
+            new = typed_figure(item) if key == "figure" else _typed_figures(item)
+            if new is not item:
+                if typed is None:
+                    typed = dict(value)
+                typed[key] = new
+        return value if typed is None else typed
+    if isinstance(value, (list, tuple)):
+        typed = None
+        for i, item in enumerate(value):
+            new = _typed_figures(item)
+            if new is not item:
+                if typed is None:
+                    typed = list(value)
+                typed[i] = new
+        return value if typed is None else typed
+    return value
+
+
+def _typed_figures_dumps(dumps):
+    """Wrap the encoder function to encode the numpy arrays of the figures
+    to typed array specs, the other ones being encoded to lists."""
+
+    def typed_dumps(obj, default):
+        def typed_default(value):
+            encoded = default(value)
+            if _is_figure(value):
+                return typed_figure(encoded)
+            return _typed_figures(encoded)
+
+        return dumps(_typed_figures(obj), typed_default)
+
+    return typed_dumps
+
+
+class RawJSON(object):
+    """Already encoded JSON, spliced verbatim into the responses instead of
+    encoded again.
+
+    It can be returned by the callbacks and the layout functions, or be a
+    prop value::
+
+        return dcc.Graph(figure=RawJSON(redis.get('figure')))
+    """
+
+    __slots__ = ("content",)
+
+    def __init__(self, content):
+        self.content = content.encode("utf-8") if isinstance(content, str) else bytes(content)
+
+    def __repr__(self):
+        return "RawJSON({!r})".format(self.content[:40] + (b"..." if len(self.content) > 40 else b""))
+
+    def to_plotly_json(self):
+        # The placeholder within the custom encoders, see _splice_raw_json_custom,
+        # the decoded value with the other encoders calling to_plotly_json
+        raw = getattr(_custom_raw_json, "raw", None)
+        if raw is None:
+            return json.loads(self.content)
+        raw.append(self.content)
+        return "{}{}".format(_RAW_JSON_MARK, len(raw) - 1)
+
+
+# Placeholder string of the RawJSON values, escaped by the encoders to \u0000.
+# Random, so strings of the requests can't be taken for it
+_RAW_JSON_MARK = "\x00dash-raw-json-{}:".format(uuid.uuid4().hex)
+_re_raw_json = re.compile(
+    b'"' + re.escape(_RAW_JSON_MARK.replace("\x00", "\\u0000").encode("ascii")) + rb'(\d+)"'
+)
+
+
+def _frozen_content(component, encode):
+    """Get the JSON of the frozen component by the encoder function, encoded
+    on the first call. See freeze()"""
+    # pylint: disable=protected-access
+    content = component._frozen_json.get(encode)
+    if content is None:
+        content = component._frozen_json[encode] = encode(component._to_plotly_json_tree(keep_frozen=False))
+    return content
+
+
+def _splice_raw_json(dumps, default):
+    """Wrap the encoder function to splice the RawJSON values into the
+    encoded JSON.
+    """
+
+    @wraps(dumps)
+    def encode(obj):
+        raw = []
+
+        def raw_json_default(value):
+            if isinstance(value, RawJSON):
+                raw.append(value.content)
+                return "{}{}".format(_RAW_JSON_MARK, len(raw) - 1)
+            frozen_json = getattr(value, "_frozen_json", None)
+            if frozen_json is not None:
+                # A frozen component, its JSON is reused
+                raw.append(_frozen_content(value, encode))
+                return "{}{}".format(_RAW_JSON_MARK, len(raw) - 1)
+            to_plotly_json_tree = getattr(value, "_to_plotly_json_tree", None)
+            if to_plotly_json_tree is not None:
+                # The whole tree of a component, instead of a call for each component
+                return to_plotly_json_tree()
+            return default(value)
+
+        content = dumps(obj, raw_json_default)
+        if raw:
+            content = _re_raw_json.sub(lambda match: raw[int(match.group(1))], content)
+        return content
+
+    return encode
+
+
+# The RawJSON contents of the custom encoder running in the thread
+_custom_raw_json = threading.local()
+
+
+def _splice_raw_json_custom(dumps):
+    """Wrap the custom encoder function, calling the ``to_plotly_json``
+    method of the objects it can't encode, to splice the RawJSON values into
+    the encoded JSON.
+    """
+
+    @wraps(dumps)
+    def encode(obj):
+        outer_raw = getattr(_custom_raw_json, "raw", None)
+        _custom_raw_json.raw = raw = []
+        try:
+            content = dumps(obj)
+        finally:
+            _custom_raw_json.raw = outer_raw
+        if raw:
+            content = _re_raw_json.sub(lambda match: raw[int(match.group(1))], content)
+        return content
+
+    return encode
+
+
+def _json_dumps(obj, default=None):
+    return json.dumps(obj, cls=plotly.utils.PlotlyJSONEncoder, default=default).encode("utf-8")
+
+
+def _orjson_dumps(obj, default):
+    # numpy arrays, datetimes and dataclasses are encoded natively,
+    # the rest (components, figures, pandas, ...) as by PlotlyJSONEncoder
+    return orjson.dumps(
+        obj, default=default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    )
+
+
+_plotly_default = plotly.utils.PlotlyJSONEncoder().default
+
+JSON_ENCODERS = {
+    "json": _splice_raw_json(_json_dumps, _plotly_default),
+    "orjson": _splice_raw_json(_orjson_dumps, _plotly_default),
+}
+
+# The encoders of DASH_JSON_TYPED_ARRAYS
+TYPED_ARRAY_JSON_ENCODERS = {
+    "json": _splice_raw_json(_typed_figures_dumps(_json_dumps), _plotly_default),
+    "orjson": _splice_raw_json(_typed_figures_dumps(_orjson_dumps), _plotly_default),
+}
+
+# The first plotly.js version decoding the typed array specs
+TYPED_ARRAYS_PLOTLYJS_VERSION = (2, 28)
+
+_re_plotlyjs_version = re.compile(rb"plotly\.js v(\d+)\.(\d+)")
+
+
+@lru_cache(maxsize=None)
+def served_plotlyjs_version():
+    """Get the ``(major, minor)`` version of the plotly.js bundled by
+    dash_core_components, None if it's unknown.
+    """
+    try:
+        dcc = import_module("dash_core_components")
+        with open(os.path.join(os.path.dirname(dcc.__file__), "plotly.min.js"), "rb") as f:
+            match = _re_plotlyjs_version.search(f.read(512))
+    except (ImportError, OSError):
+        return None
+    return tuple(int(part) for part in match.groups()) if match else None
+
+
+@lru_cache(maxsize=None)
+def get_json_encoder(name, typed_arrays=False):
+    """Get the function encoding an object to JSON bytes.
+
+    The ``RawJSON`` values are spliced by the ``json`` and ``orjson``
+    encoders, and by the functions calling the ``to_plotly_json`` method of
+    the objects they can't encode, as PlotlyJSONEncoder.
+
+    :param name: ``json``, ``orjson``, ``auto`` (``orjson`` if it's
+        installed, ``json`` otherwise) or the dotted path of a function.
+    :param typed_arrays: Encode the numpy arrays of the figure data to
+        plotly.js typed arrays, with the ``json`` and ``orjson`` encoders.
+        It requires the plotly.js 2.28+ decoding them.
+    """
+    if name == "auto":
+        name = "json" if orjson is None else "orjson"
+    if name == "orjson" and orjson is None:
+        raise ImproperlyConfigured("The orjson JSON encoder requires the orjson package")
+    if name in JSON_ENCODERS:
+        if typed_arrays:
+            version = served_plotlyjs_version()
+            if version is None or version < TYPED_ARRAYS_PLOTLYJS_VERSION:
+                raise ImproperlyConfigured(
+                    "DASH_JSON_TYPED_ARRAYS requires the plotly.js {}.{}+ of dash_core_components, "
+                    "found {}".format(*TYPED_ARRAYS_PLOTLYJS_VERSION, "{}.{}".format(*version) if version else None)
+                )
+            return TYPED_ARRAY_JSON_ENCODERS[name]
+        return JSON_ENCODERS[name]
+
+    try:
+        module_name, func_name = name.rsplit(".", 1)
+        dumps = getattr(import_module(module_name), func_name)
+    except (ValueError, ImportError, AttributeError):
+        raise ImproperlyConfigured("Unknown JSON encoder {!r}".format(name))
+    return _splice_raw_json_custom(dumps)
+
+
+JSON_DECODERS = {
+    "json": json.loads,
+    "orjson": None if orjson is None else orjson.loads,
+}
+
+
+@lru_cache(maxsize=None)
+def get_json_decoder(name):
+    """Get the function decoding JSON bytes.
+
+    :param name: ``json``, ``orjson``, ``auto`` (``orjson`` if it's
+        installed, ``json`` otherwise) or the dotted path of a function.
+    """
+    if name == "auto":
+        name = "json" if orjson is None else "orjson"
+    if name == "orjson" and orjson is None:
+        raise ImproperlyConfigured("The orjson JSON decoder requires the orjson package")
+    if name in JSON_DECODERS:
+        return JSON_DECODERS[name]
+
+    try:
+        module_name, func_name = name.rsplit(".", 1)
+        return getattr(import_module(module_name), func_name)
+    except (ValueError, ImportError, AttributeError):
+        raise ImproperlyConfigured("Unknown JSON decoder {!r}".format(name))
+
+
+def from_json(data):
+    """Decode JSON bytes with the ``DASH_JSON_DECODER`` setting, ``json`` by
+    default.
+    """
+    try:
+        name = getattr(settings, "DASH_JSON_DECODER", "json")
+    except ImproperlyConfigured:
+        name = "json"
+    return get_json_decoder(name)(data)
+
+
+def json_encoder():
+    """Get the JSON encoder of the ``DASH_JSON_ENCODER`` setting, ``json``
+    (PlotlyJSONEncoder) by default.
+
+    With the ``DASH_JSON_TYPED_ARRAYS`` setting, the numpy arrays of the
+    figure data are encoded to plotly.js typed arrays.
+    """
+    try:
+        name = getattr(settings, "DASH_JSON_ENCODER", "json")
+        typed_arrays = getattr(settings, "DASH_JSON_TYPED_ARRAYS", False)
+    except ImproperlyConfigured:
+        name, typed_arrays = "json", False
+    return get_json_encoder(name, typed_arrays)
+
+
+def to_json(obj):
+    """Encode the object to JSON bytes with the ``DASH_JSON_ENCODER``
+    setting.
+    """
+    return json_encoder()(obj)
+
+
+class _JSONPiece(str):
+    """Encoded JSON punctuation, not a value to encode."""
+
+
+_encode_json_str = json.encoder.encode_basestring_ascii  # pylint: disable=no-member
+_JSON_CONSTANTS = {None: "null", True: "true", False: "false"}
+
+
+def _iter_json_dict(value, typed_arrays=False):
+    yield _JSONPiece("{")
+    separator = ""
+    for key, item in value.items():
+        yield _JSONPiece(separator + _encode_json_str(key if isinstance(key, str) else str(key)) + ":")
+        if typed_arrays and key == "figure":
+            # As by the encoders, the arrays of the figure aren't encoded on their own
+            item = typed_figure(item.to_plotly_json() if _is_figure(item) else item)
+        yield item
+        separator = ","
+    yield _JSONPiece("}")
+
+
+def _iter_json_list(value):
+    yield _JSONPiece("[")
+    separator = None
+    for item in value:
+        if separator is not None:
+            yield separator
+        separator = _JSONPiece(",")
+        yield item
+    yield _JSONPiece("]")
+
+
+def iter_json(obj, chunk_size=64 * 1024):
+    """Encode the object to chunks of JSON bytes of about ``chunk_size``.
+
+    The dicts, lists and ``to_plotly_json`` of the components are walked
+    instead of encoded at once, so the whole document is never held in
+    memory. The other values (arrays, dates, ...) are encoded by the
+    ``DASH_JSON_ENCODER`` setting.
+    """
+    encode = json_encoder()
+    typed_arrays = encode in TYPED_ARRAY_JSON_ENCODERS.values()
+    numpy = sys.modules.get("numpy")
+    buffer, size = [], 0
+    stack = [iter((obj,))]
+    while stack:
+        try:
+            item = next(stack[-1])
+        except StopIteration:
+            stack.pop()
+            continue
+
+        cls = type(item)
+        if cls is _JSONPiece or cls is str:
+            piece = item if cls is _JSONPiece else _encode_json_str(item)
+        elif cls is RawJSON:
+            piece = item.content.decode("utf-8")
+        elif cls is int:
+            piece = int.__repr__(item)
+        elif item is None or cls is bool:
+            piece = _JSON_CONSTANTS[item]
+        elif cls is float:
+            piece = float.__repr__(item) if math.isfinite(item) else "null"
+        else:
+            if hasattr(item, "to_plotly_json") and not (numpy and isinstance(item, numpy.ndarray)):
+                if getattr(item, "_frozen_json", None) is not None:
+                    item = RawJSON(_frozen_content(item, encode))
+                elif typed_arrays and _is_figure(item):
+                    item = typed_figure(item.to_plotly_json())
+                else:
+                    item = item.to_plotly_json()
+
+            if isinstance(item, dict):
+                stack.append(_iter_json_dict(item, typed_arrays))
+                continue
+            if isinstance(item, (list, tuple)):
+                stack.append(_iter_json_list(item))
+                continue
+            piece = item.content.decode("utf-8") if type(item) is RawJSON else encode(item).decode("utf-8")
+
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
 def generate_hash():
     return str(uuid.uuid4().hex).strip("-")
 
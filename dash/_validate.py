@@ -213,10 +213,13 @@ def fail_callback_output(output_value, output):
         # val is a Component
         if isinstance(val, Component):
             # pylint: disable=protected-access
-            for p, j in val._traverse_with_paths():
+            for trail in val._walk():
                 # check each component value in the tree
+                j = trail[0]
                 if not _value_is_valid(j):
-                    _raise_invalid(bad_val=j, outer_val=val, path=p, index=index)
+                    _raise_invalid(
+                        bad_val=j, outer_val=val, path=val._format_path(trail), index=index
+                    )
 
                 # Children that are not of type Component or
                 # list/tuple not returned by traverse
@@ -226,7 +229,7 @@ def fail_callback_output(output_value, output):
                         _raise_invalid(
                             bad_val=child,
                             outer_val=val,
-                            path=p + "\n" + "[*] " + type(child).__name__,
+                            path=val._format_path(trail) + "\n" + "[*] " + type(child).__name__,
                             index=index,
                         )
 
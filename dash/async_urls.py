@@ -0,0 +1,21 @@
+from django.conf.urls import include, url
+
+from .views import BaseDashView
+
+
+# Async views of Dash apps for ASGI deployments (Django>=3.1)
+urlpatterns = [
+    url(r'^(?P<dash_name>[\-\w_:.0-9]+)/', include([
+        url(r'^$', BaseDashView.async_serve_dash_index),
+        url(r'^(?P<path>[\-\w_.@0-9]+)/$', BaseDashView.async_serve_dash_index),
+        url(r'^_dash-dependencies', BaseDashView.async_serve_dash_dependencies),
+        url(r'^_dash-layout', BaseDashView.async_serve_dash_layout),
+        url(r'^_dash-update-component', BaseDashView.async_serve_dash_upd_component),
+        url(r'^_dash-component-suites/(?P<package_name>[\-\w_@0-9]+)/'
+            r'(?P<fingerprinted_path>[\-\w_.@0-9]+)',
+            BaseDashView.async_serve_dash_component_suites),
+        url(r'^_dash-routes', BaseDashView.async_serve_dash_routes),
+        url(r'^_reload-hash', BaseDashView.async_serve_reload_hash),
+        url(r'^_favicon.ico', BaseDashView.async_serve_default_favicon)
+    ]))
+]
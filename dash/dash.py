@@ -2,7 +2,9 @@ from __future__ import print_function
 
 import os
 import sys
+import asyncio
 import collections
+import copy
 import importlib
 import json
 import pkgutil
@@ -10,6 +12,7 @@ import logging
 import mimetypes
 import hashlib
 import base64
+import types
 from functools import wraps
 
 from django.contrib.staticfiles.utils import get_files
@@ -18,16 +21,17 @@ from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from django.utils.safestring import mark_safe
 
-import plotly
 import dash_renderer
 
 from .fingerprint import build_fingerprint, check_fingerprint
 from .resources import Scripts, Css
 from .dependencies import handle_callback_args
-from .exceptions import PreventUpdate
+from .exceptions import PreventUpdate, FrozenCallbacksError, CallbackException
 from .version import __version__
 from ._utils import (
     AttributeDict,
+    async_to_sync,
+    sync_to_async,
     create_callback_id,
     format_tag,
     generate_hash,
@@ -35,8 +39,11 @@ from ._utils import (
     interpolate_str,
     patch_collections_abc,
     stringify_id,
+    to_json,
 )
 from . import _validate
+from ._memoize import Memoize
+from .staticfiles.compress import compressed_siblings
 
 
 __all__ = (
@@ -60,6 +67,13 @@ class _NoUpdate(object):
     pass
 
 
+def _copy_attribute_dict(value):
+    # The keys first, finalize refuses the new ones
+    copied = AttributeDict(value)
+    copied.__dict__.update(value.__dict__)
+    return copied
+
+
 # Singleton signal to not update an output, alternative to PreventUpdate
 no_update = _NoUpdate()
 
@@ -148,7 +162,11 @@ class Dash(object):
         If ``False`` we will use CDN links where available.
     :type serve_locally: boolean
 
-    :param compress: Use gzip to compress files and data served by Flask.
+    :param compress: Use gzip to compress data served by the views (see
+        the ``dash_compress_*`` attributes of the views for the threshold,
+        the level and the streaming size), and serve the precompressed
+        ``.br``/``.gz`` variants of the component suites written by the
+        ``compress_dash_suites`` command.
         Default ``True``
     :type compress: boolean
 
@@ -217,6 +235,7 @@ class Dash(object):
                  eager_loading=False,
                  url_base_pathname='/',
                  serve_locally=True,
+                 compress=True,
                  meta_tags=None,
                  external_scripts=None,
                  external_stylesheets=None,
@@ -241,6 +260,7 @@ class Dash(object):
             routes_pathname_prefix=url_base_pathname,
             requests_pathname_prefix=url_base_pathname,
             serve_locally=serve_locally,
+            compress=compress,
             meta_tags=meta_tags or [],
             external_scripts=external_scripts or [],
             external_stylesheets=external_stylesheets or [],
@@ -276,6 +296,10 @@ class Dash(object):
         self.callback_map = {}
         # same deps as a list to catch duplicate outputs, and to send to the front end
         self._callback_list = []
+        # both are replaced by read-only snapshots when the callbacks are frozen
+        self._callbacks_frozen = False
+        # (JSON, hash) of the frozen dependencies
+        self._dependencies_cache = None
 
         # list of inline scripts
         self._inline_scripts = []
@@ -293,14 +317,21 @@ class Dash(object):
         self.scripts = Scripts(serve_locally, eager_loading)
 
         self.registered_paths = collections.defaultdict(set)
+        # stats of the served component suites files
+        self._component_suite_files = {}
 
         # urls
         self.routes = []
 
         self._layout = None
         self._layout_is_function = False
+        # (JSON, hash) of the static layout
+        self._layout_cache = None
         self.validation_layout = None
 
+        # (key, index, etag) of the last rendered index page
+        self._index_cache = None
+
         self._setup_dev_tools()
         self._hot_reload = AttributeDict(
             hash=None,
@@ -310,7 +341,7 @@ class Dash(object):
             changed_assets=[],
         )
 
-        # self._assets_files = []
+        self._assets_files = []
 
         self.logger = logging.getLogger('dj_plotly_dash')
         # self.logger.addHandler(logging.StreamHandler(stream=sys.stdout))
@@ -393,11 +424,27 @@ class Dash(object):
     def _layout_value(self):
         return self._layout() if self._layout_is_function else self._layout
 
+    def layout_json(self):
+        """Get the layout serialized to JSON bytes and the hash of them.
+
+        A static layout is serialized once, until ``layout`` is set again,
+        so changes made inside of it afterwards are not served. The hash of
+        a function layout is ``None``.
+        """
+        cached = self._layout_cache
+        if cached is None:
+            content = to_json(self._layout_value())
+            if self._layout_is_function:
+                return content, None
+            cached = self._layout_cache = (content, hashlib.md5(content).hexdigest())
+        return cached
+
     @layout.setter
     def layout(self, value):
         _validate.validate_layout_type(value)
         self._layout_is_function = isinstance(value, patch_collections_abc("Callable"))
         self._layout = value
+        self._layout_cache = None
 
         # for using flask.has_request_context() to deliver a full layout for
         # validation inside a layout function - track if a user might be doing this.
@@ -620,7 +667,7 @@ class Dash(object):
         config = self._config()
         config.update(kwargs)
         return '<script id="_dash-config" type="application/json">{}</script>'.format(
-            json.dumps(config, cls=plotly.utils.PlotlyJSONEncoder)
+            to_json(config).decode("utf-8")
         )
 
     def _generate_renderer(self):
@@ -647,6 +694,57 @@ class Dash(object):
 
         return "\n      ".join(tags)
 
+    def component_suite_file(self, package_name, fingerprinted_path):
+        """Find the file of a registered component suite resource.
+
+        The file stats are kept, unless hot reload is on.
+
+        :return: The path in the package, whether the path is fingerprinted,
+            and ``AttributeDict(filename, size, mtime, etag, encodings)`` of
+            the file, or ``None`` if the package isn't on the file system.
+            ``encodings`` maps the content codings to the stats of the
+            precompressed variants.
+        """
+        path_in_pkg, has_fingerprint = check_fingerprint(fingerprinted_path)
+
+        key = (package_name, path_in_pkg)
+        stats = self._component_suite_files.get(key)
+        if stats is None or self._dev_tools.hot_reload:
+            if path_in_pkg not in self.registered_paths.get(package_name, ()):
+                # the paths are registered along with the index page
+                self._generate_scripts_html()
+                self._generate_css_dist_html()
+            _validate.validate_js_path(self.registered_paths, package_name, path_in_pkg)
+
+            filename = os.path.join(
+                os.path.dirname(importlib.import_module(package_name).__file__),
+                *path_in_pkg.split("/")
+            )
+            if not os.path.isfile(filename):
+                return path_in_pkg, has_fingerprint, None
+
+            info = os.stat(filename)
+            etag = "{:x}-{:x}".format(int(info.st_mtime), info.st_size)
+            # The precompressed variants written by the compress_dash_suites command
+            encodings = collections.OrderedDict(
+                (encoding, AttributeDict(
+                    filename=sibling,
+                    size=os.stat(sibling).st_size,
+                    mtime=info.st_mtime,
+                    etag="{}-{}".format(etag, encoding),
+                ))
+                for encoding, sibling in compressed_siblings(filename, info.st_mtime).items()
+            )
+            stats = self._component_suite_files[key] = AttributeDict(
+                filename=filename,
+                size=info.st_size,
+                mtime=info.st_mtime,
+                etag=etag,
+                encodings=encodings,
+            )
+
+        return path_in_pkg, has_fingerprint, stats
+
     # pylint: disable=unused-argument
     def serve_component_suites(self, package_name, fingerprinted_path, *args, **kwargs):
         """ Serve the JS bundles for each package
@@ -688,10 +786,50 @@ class Dash(object):
         #
         return pkgutil.get_data(package_name, path_in_pkg)
 
+    def _index_key(self):
+        # everything the index page depends on, besides the component packages
+        return (
+            json.dumps([self.config, self._dev_tools], sort_keys=True, default=repr),
+            self.title,
+            self.renderer,
+            getattr(self, 'app_entry', _app_entry),
+            self._favicon,
+            id(self.validation_layout),
+            tuple(self._inline_scripts),
+            len(self.scripts._resources._resources),  # pylint: disable=protected-access
+            len(self.css._resources._resources),  # pylint: disable=protected-access
+        )
+
     def index(self, *args, **kwargs):  # pylint: disable=unused-argument
-        if self.config.assets_folder:
+        """Get the pieces of the index page.
+
+        They are cached and generated again only when the config or the
+        resources of the app change. The assets folder is walked once,
+        or on every call when hot reload is on.
+        """
+        cached = self._index_cache
+        hot_reload = self._dev_tools.hot_reload
+
+        if self.config.assets_folder and (cached is None or hot_reload):
             self._walk_assets_directory()
 
+        key = self._index_key()
+        if cached is None or cached[0] != key or hot_reload:
+            index = self._generate_index()
+            etag = hashlib.md5(
+                "".join(index[k] for k in sorted(index)).encode("utf-8")
+            ).hexdigest()
+            cached = self._index_cache = (key, index, etag)
+
+        return cached[1]
+
+    def index_etag(self):
+        """Get the hash of the index page pieces."""
+        if self._index_cache is None:
+            self.index()
+        return self._index_cache[2]
+
+    def _generate_index(self):
         scripts = self._generate_scripts_html()
         css = self._generate_css_dist_html()
         config = self._generate_config_html()
@@ -800,11 +938,74 @@ class Dash(object):
     def dependencies(self, *args, **kwargs):  # pylint: disable=unused-argument
         return self._callback_list
 
+    def dependencies_json(self):
+        """Get the dependencies serialized to JSON bytes and the hash of them.
+
+        Frozen dependencies are serialized only once.
+        """
+        cached = self._dependencies_cache
+        if cached is None:
+            content = to_json(self._callback_list)
+            cached = (content, hashlib.md5(content).hexdigest())
+            if self._callbacks_frozen:
+                self._dependencies_cache = cached
+        return cached
+
+    def copy(self):
+        """Get a copy of the app with its own config, dev tools and
+        callbacks, not frozen, for a view serving it at its own base url.
+
+        The layout, the resources and the callback functions are shared.
+        """
+        app = copy.copy(self)
+        app.config = _copy_attribute_dict(self.config)
+        app._dev_tools = _copy_attribute_dict(self._dev_tools)
+        app._hot_reload = _copy_attribute_dict(self._hot_reload)
+        app.callback_map = {k: dict(v) for k, v in self.callback_map.items()}
+        app._callback_list = list(self._callback_list)
+        app._callbacks_frozen = False
+        app._dependencies_cache = None
+        app._index_cache = None
+        app._inline_scripts = list(self._inline_scripts)
+        app.routes = list(self.routes)
+        app._assets_files = list(self._assets_files)
+        return app
+
+    @property
+    def callbacks_frozen(self):
+        return self._callbacks_frozen
+
+    def freeze_callbacks(self):
+        """End the registration of callbacks.
+
+        ``callback_map`` and the dependencies list are replaced by read-only
+        snapshots, which are shared by concurrent requests without locks.
+        Registering an already known output again is ignored afterwards,
+        so views sharing one app don't grow its callbacks on every request.
+        """
+        if self._callbacks_frozen:
+            return
+
+        self.callback_map = types.MappingProxyType(
+            {k: types.MappingProxyType(v) for k, v in self.callback_map.items()}
+        )
+        self._callback_list = tuple(self._callback_list)
+        self._callbacks_frozen = True
+        self.dependencies_json()
+
     def _insert_callback(self, output, inputs, state, prevent_initial_call):
         if prevent_initial_call is None:
             prevent_initial_call = self.config.prevent_initial_callbacks
 
         callback_id = create_callback_id(output)
+        if self._callbacks_frozen:
+            if callback_id in self.callback_map:
+                return callback_id
+            raise FrozenCallbacksError(
+                "Callback for output '{}' can't be added, the callbacks "
+                "of the app are already frozen.".format(callback_id)
+            )
+
         callback_spec = {
             "output": callback_id,
             "inputs": [c.to_dict() for c in inputs],
@@ -812,14 +1013,23 @@ class Dash(object):
             "clientside_function": None,
             "prevent_initial_call": prevent_initial_call,
         }
+        if callback_id in self.callback_map:
+            # registered again (e.g. by another view of a shared app): replace it
+            self._callback_list[self._callback_index(callback_id)] = callback_spec
+        else:
+            self._callback_list.append(callback_spec)
         self.callback_map[callback_id] = {
             "inputs": callback_spec["inputs"],
             "state": callback_spec["state"],
         }
-        self._callback_list.append(callback_spec)
 
         return callback_id
 
+    def _callback_index(self, callback_id):
+        return next(
+            i for i, spec in enumerate(self._callback_list) if spec["output"] == callback_id
+        )
+
     def clientside_callback(self, clientside_function, *args, **kwargs):
         """Create a callback that updates the output by calling a clientside
         (JavaScript) function instead of a Python function.
@@ -886,7 +1096,9 @@ class Dash(object):
         `False` unless `prevent_initial_callbacks=True` at the app level.
         """
         output, inputs, state, prevent_initial_call = handle_callback_args(args, kwargs)
-        self._insert_callback(output, inputs, state, prevent_initial_call)
+        callback_id = self._insert_callback(output, inputs, state, prevent_initial_call)
+        if self._callbacks_frozen:
+            return
 
         # If JS source is explicitly given, create a namespace and function
         # name, then inject the code.
@@ -899,20 +1111,20 @@ class Dash(object):
             namespace = "_dashprivate_{}".format(out0.component_id)
             function_name = "{}".format(out0.component_property)
 
-            self._inline_scripts.append(
-                _inline_clientside_template.format(
-                    namespace=namespace.replace('"', '\\"'),
-                    function_name=function_name.replace('"', '\\"'),
-                    clientside_function=clientside_function,
-                )
+            inline_script = _inline_clientside_template.format(
+                namespace=namespace.replace('"', '\\"'),
+                function_name=function_name.replace('"', '\\"'),
+                clientside_function=clientside_function,
             )
+            if inline_script not in self._inline_scripts:
+                self._inline_scripts.append(inline_script)
 
         # Callback is stored in an external asset.
         else:
             namespace = clientside_function.namespace
             function_name = clientside_function.function_name
 
-        self._callback_list[-1]["clientside_function"] = {
+        self._callback_list[self._callback_index(callback_id)]["clientside_function"] = {
             "namespace": namespace,
             "function_name": function_name,
         }
@@ -929,75 +1141,169 @@ class Dash(object):
         not to fire when its outputs are first added to the page. Defaults to
         `False` unless `prevent_initial_callbacks=True` at the app level.
 
+        The callback may be a coroutine function (`async def`). It is awaited
+        directly by the async views, and run in its own event loop by the
+        sync views. Sync callbacks are run in a thread by the async views.
 
+        The optional `memoize` argument caches the responses of the callback
+        by the values of its inputs and states: `True`, or a
+        `dash.Memoize(timeout, max_bytes, cache_alias)` for the expiry, the
+        size of the in-process cache, or a Django cache shared by the
+        workers. `invalidate_memoized` drops the cached responses, of the
+        copies of the app too.
         """
+        memoize = _kwargs.pop("memoize", None)
         output, inputs, state, prevent_initial_call = handle_callback_args(
             _args, _kwargs
         )
+        if memoize is True:
+            # The one of the callback registered again, as by the views of the copies
+            # of the app, so they share the cached responses
+            memoize = self.callback_map.get(create_callback_id(output), {}).get("memoize") or Memoize()
         callback_id = self._insert_callback(output, inputs, state, prevent_initial_call)
         multi = isinstance(output, (list, tuple))
 
+        def make_response(output_value, output_spec):
+            if isinstance(output_value, _NoUpdate):
+                raise PreventUpdate
+
+            # wrap single outputs so we can treat them all the same
+            # for validation and response creation
+            if not multi:
+                output_value, output_spec = [output_value], [output_spec]
+
+            _validate.validate_multi_return(output_spec, output_value, callback_id)
+
+            component_ids = collections.defaultdict(dict)
+            has_update = False
+            for val, spec in zip(output_value, output_spec):
+                if isinstance(val, _NoUpdate):
+                    continue
+                for vali, speci in (
+                    zip(val, spec) if isinstance(spec, list) else [[val, spec]]
+                ):
+                    if not isinstance(vali, _NoUpdate):
+                        has_update = True
+                        id_str = stringify_id(speci["id"])
+                        component_ids[id_str][speci["property"]] = vali
+
+            if not has_update:
+                raise PreventUpdate
+
+            response = {"response": component_ids, "multi": True}
+
+            # try:
+            #     jsonResponse = json.dumps(
+            #         response, cls=plotly.utils.PlotlyJSONEncoder
+            #     )
+            # except TypeError:
+            #     _validate.fail_callback_output(output_value, output)
+
+            return output_value, response
+
         def wrap_func(func):
+            is_coroutine = asyncio.iscoroutinefunction(func)
+            if is_coroutine and async_to_sync is None:
+                raise CallbackException(
+                    "Async callback for output '{}' requires asgiref "
+                    "(Django>=3.0).".format(callback_id)
+                )
+
             @wraps(func)
             def add_context(*args, **kwargs):
                 output_spec = kwargs.pop("outputs_list")
 
-                # don't touch the comment on the next line - used by debugger
-                output_value = func(*args, **kwargs)  # %% callback invoked %%
+                if memoize:
+                    key = memoize.make_key(callback_id, func, args, output_spec)
+                    cached = memoize.get(key)
+                    if cached is not None:
+                        return cached
 
-                if isinstance(output_value, _NoUpdate):
-                    raise PreventUpdate
+                try:
+                    if is_coroutine:
+                        output_value = async_to_sync(func)(*args, **kwargs)
+                    else:
+                        # don't touch the comment on the next line - used by debugger
+                        output_value = func(*args, **kwargs)  # %% callback invoked %%
 
-                # wrap single outputs so we can treat them all the same
-                # for validation and response creation
-                if not multi:
-                    output_value, output_spec = [output_value], [output_spec]
+                    result = make_response(output_value, output_spec)
+                except PreventUpdate:
+                    if memoize:
+                        memoize.set(key, None)
+                    raise
 
-                _validate.validate_multi_return(output_spec, output_value, callback_id)
+                if memoize:
+                    memoize.set(key, result)
+                return result
 
-                component_ids = collections.defaultdict(dict)
-                has_update = False
-                for val, spec in zip(output_value, output_spec):
-                    if isinstance(val, _NoUpdate):
-                        continue
-                    for vali, speci in (
-                        zip(val, spec) if isinstance(spec, list) else [[val, spec]]
-                    ):
-                        if not isinstance(vali, _NoUpdate):
-                            has_update = True
-                            id_str = stringify_id(speci["id"])
-                            component_ids[id_str][speci["property"]] = vali
+            @wraps(func)
+            async def async_add_context(*args, **kwargs):
+                output_spec = kwargs.pop("outputs_list")
 
-                if not has_update:
-                    raise PreventUpdate
+                if memoize:
+                    # The cache and the encoder may block, kept out of the event loop
+                    key = await sync_to_async(memoize.make_key)(callback_id, func, args, output_spec)
+                    cached = await sync_to_async(memoize.get)(key)
+                    if cached is not None:
+                        return cached
 
-                response = {"response": component_ids, "multi": True}
+                try:
+                    if is_coroutine:
+                        output_value = await func(*args, **kwargs)
+                    else:
+                        output_value = await sync_to_async(func)(*args, **kwargs)
 
-                # try:
-                #     jsonResponse = json.dumps(
-                #         response, cls=plotly.utils.PlotlyJSONEncoder
-                #     )
-                # except TypeError:
-                #     _validate.fail_callback_output(output_value, output)
+                    result = make_response(output_value, output_spec)
+                except PreventUpdate:
+                    if memoize:
+                        await sync_to_async(memoize.set)(key, None)
+                    raise
 
-                return output_value, response
+                if memoize:
+                    await sync_to_async(memoize.set)(key, result)
+                return result
 
-            self.callback_map[callback_id]["callback"] = add_context
+            if not self._callbacks_frozen:
+                self.callback_map[callback_id]["callback"] = add_context
+                self.callback_map[callback_id]["async_callback"] = async_add_context
+                self.callback_map[callback_id]["memoize"] = memoize or None
 
             return add_context
 
         return wrap_func
 
-    def update_component(self, output, outputs_list, inputs, state, **kwargs):
-        args = inputs_to_vals(inputs + state)
+    def invalidate_memoized(self, callback_id=None):
+        """Drop the cached responses of the memoized callback, of all the
+        memoized callbacks by default.
+
+        :param callback_id: The ``output`` of the callback in ``callback_map``.
+        """
+        callback_ids = [callback_id] if callback_id is not None else list(self.callback_map)
+        for output in callback_ids:
+            memoize = self.callback_map[output].get("memoize")
+            if memoize:
+                # Of the copies of the app too, see Memoize
+                memoize.invalidate(output, self.callback_map[output]["callback"].__wrapped__)
+
+    def _callback_func(self, output, key="callback"):
         try:
-            func = self.callback_map[output]["callback"]
+            return self.callback_map[output][key]
         except KeyError:
             msg = "Callback function not found for output '{}', perhaps you forgot to prepend the '@'?"
             raise KeyError(msg.format(output))
 
+    def update_component(self, output, outputs_list, inputs, state, **kwargs):
+        args = inputs_to_vals(inputs + state)
+        func = self._callback_func(output)
+
         return func(*args, outputs_list=outputs_list)
 
+    async def async_update_component(self, output, outputs_list, inputs, state, **kwargs):
+        args = inputs_to_vals(inputs + state)
+        func = self._callback_func(output, "async_callback")
+
+        return await func(*args, outputs_list=outputs_list)
+
     def _add_assets_resource(self, url_path, file_path):
         res = {"asset_path": url_path, "filepath": file_path}
         if self.config.assets_external_path:
@@ -1014,6 +1320,11 @@ class Dash(object):
             path = staticfiles_storage.url(f)
             full = staticfiles_storage.path(f)
 
+            if full in self._assets_files:
+                # Already registered by the previous call
+                continue
+            self._assets_files.append(full)
+
             if f.endswith('js'):
                 self.scripts.append_script(self._add_assets_resource(path, full))
             elif f.endswith('css'):
@@ -2,7 +2,6 @@ from collections import OrderedDict
 import copy
 import os
 
-from dash.development.base_component import _explicitize_args
 from dash.exceptions import NonExistentEventException
 from ._all_keywords import python_keywords
 from .base_component import Component
@@ -43,32 +42,25 @@ def generate_class_string(typename, props, description, namespace):
     # not all component authors will supply those.
     c = '''class {typename}(Component):
     """{docstring}"""
-    @_explicitize_args
+    __slots__ = {slots}
+    _prop_names = {list_of_valid_keys}
+    _type = '{typename}'
+    _namespace = '{namespace}'
+    _valid_wildcard_attributes = {list_of_valid_wildcard_attr_prefixes}
+    available_properties = {list_of_valid_keys}
+    available_wildcard_properties = {list_of_valid_wildcard_attr_prefixes}
+
     def __init__(self, {default_argtext}):
-        self._prop_names = {list_of_valid_keys}
-        self._type = '{typename}'
-        self._namespace = '{namespace}'
-        self._valid_wildcard_attributes =\
-            {list_of_valid_wildcard_attr_prefixes}
-        self.available_properties = {list_of_valid_keys}
-        self.available_wildcard_properties =\
-            {list_of_valid_wildcard_attr_prefixes}
-
-        _explicit_args = kwargs.pop('_explicit_args')
-        _locals = locals()
-        _locals.update(kwargs)  # For wildcard attrs
-        args = {{k: _locals[k] for k in _explicit_args if k != 'children'}}
-
-        for k in {required_props}:
-            if k not in args:
-                raise TypeError(
-                    'Required argument `' + k + '` was not specified.')
-        super({typename}, self).__init__({argtext})
+        _args = kwargs  # The explicit args, with the wildcard attrs
+{explicit_args}{required_checks}        super({typename}, self).__init__({argtext})
 '''
 
     filtered_props = reorder_props(filter_props(props))
     wildcard_prefixes = repr(parse_wildcards(props))
     list_of_valid_keys = repr(list(map(str, filtered_props.keys())))
+    # The props are stored in slots, the instance dict only holds the
+    # wildcard attributes
+    slots = repr(tuple(str(p) for p in filtered_props if not p.endswith("-*")))
     docstring = create_docstring(
         component_name=typename, props=filtered_props, description=description
     ).replace("\r\n", "\n")
@@ -80,10 +72,15 @@ def generate_class_string(typename, props, description, namespace):
     if "children" in props:
         prop_keys.remove("children")
         default_argtext = "children=None, "
-        argtext = "children=children, **args"
+        argtext = "children=children, **_args"
     else:
         default_argtext = ""
-        argtext = "**args"
+        argtext = "**_args"
+    arg_keys = [
+        p
+        for p in prop_keys
+        if not p.endswith("-*") and p not in python_keywords and p != "setProps"
+    ]
     default_argtext += ", ".join(
         [
             (
@@ -91,12 +88,31 @@ def generate_class_string(typename, props, description, namespace):
                 if props[p]["required"]
                 else "{:s}=Component.UNDEFINED".format(p)
             )
-            for p in prop_keys
-            if not p.endswith("-*") and p not in python_keywords and p != "setProps"
+            for p in arg_keys
         ]
         + ["**kwargs"]
     )
-    required_args = required_props(props)
+    # The args given explicitly, without going through locals()
+    explicit_args = "".join(
+        "        if {0:s} is not Component.{1:s}:\n"
+        "            _args['{0:s}'] = {0:s}\n".format(
+            p, "REQUIRED" if props[p]["required"] else "UNDEFINED"
+        )
+        for p in arg_keys
+    )
+    required_checks = ""
+    for p in required_props(props):
+        if p == "children":
+            condition = "children is None"
+        elif p in arg_keys:
+            condition = "{:s} is Component.REQUIRED".format(p)
+        else:
+            condition = "'{:s}' not in _args".format(p)
+        required_checks += (
+            "        if {}:\n"
+            "            raise TypeError(\n"
+            "                'Required argument `{}` was not specified.')\n".format(condition, p)
+        )
     return c.format(
         typename=typename,
         namespace=namespace,
@@ -106,7 +122,9 @@ def generate_class_string(typename, props, description, namespace):
         docstring=docstring,
         default_argtext=default_argtext,
         argtext=argtext,
-        required_props=required_args,
+        explicit_args=explicit_args,
+        required_checks=required_checks,
+        slots=slots,
     )
 
 
@@ -126,7 +144,7 @@ def generate_class_file(typename, props, description, namespace):
     import_string = (
         "# AUTO GENERATED FILE - DO NOT EDIT\n\n"
         + "from dash.development.base_component import "
-        + "Component, _explicitize_args\n\n\n"
+        + "Component\n\n\n"
     )
     class_string = generate_class_string(typename, props, description, namespace)
     file_name = "{:s}.py".format(typename)
@@ -182,7 +200,7 @@ def generate_class(typename, props, description, namespace):
     -------
     """
     string = generate_class_string(typename, props, description, namespace)
-    scope = {"Component": Component, "_explicitize_args": _explicitize_args}
+    scope = {"Component": Component}
     # pylint: disable=exec-used
     exec(string, scope)
     result = scope[typename]
@@ -1,6 +1,11 @@
 import abc
+import contextlib
+import contextvars
+import functools
 import inspect
+import itertools
 import sys
+import types
 from future.utils import with_metaclass
 
 from .._utils import patch_collections_abc, _strings, stringify_id
@@ -59,6 +64,30 @@ def is_number(s):
         return False
 
 
+# Whether the components validate their props when they are built
+_props_check = contextvars.ContextVar("dash_props_check", default=True)
+
+
+@contextlib.contextmanager
+def props_check(enabled=True):
+    """Enable or disable the validation of the props of the components built
+    in the context, by their constructors.
+
+    The views disable it for the layouts and the callbacks with
+    ``dash_props_check = False``, or the ``DASH_PROPS_CHECK`` setting.
+    """
+    token = _props_check.set(enabled)
+    try:
+        yield
+    finally:
+        _props_check.reset(token)
+
+
+def _is_component(value):
+    # Faster than isinstance, which goes through the ABCMeta of Component
+    return Component in type(value).__mro__
+
+
 def _check_if_has_indexable_children(item):
     if not hasattr(item, "children") or (
         not isinstance(item.children, Component)
@@ -78,6 +107,8 @@ class Component(with_metaclass(ComponentMeta, object)):
 
     UNDEFINED = _UNDEFINED()
 
+    _frozen_json = None  # See freeze()
+
     class _REQUIRED(object):
         def __repr__(self):
             return "required"
@@ -89,42 +120,30 @@ class Component(with_metaclass(ComponentMeta, object)):
 
     def __init__(self, **kwargs):
         # pylint: disable=super-init-not-called
-        for k, v in list(kwargs.items()):
-            # pylint: disable=no-member
-            k_in_propnames = k in self._prop_names
-            k_in_wildcards = any(
-                [k.startswith(w) for w in self._valid_wildcard_attributes]
-            )
-            # e.g. "The dash_core_components.Dropdown component (version 1.6.0)
-            # with the ID "my-dropdown"
-            try:
-                error_string_prefix = "The `{}.{}` component (version {}){}".format(
-                    self._namespace,
-                    self._type,
-                    getattr(__import__(self._namespace), "__version__", "unknown"),
-                    ' with the ID "{}"'.format(kwargs["id"]) if "id" in kwargs else "",
-                )
-            except ImportError:
-                # Our tests create mock components with libraries that
-                # aren't importable
-                error_string_prefix = "The `{}` component{}".format(
-                    self._type,
-                    ' with the ID "{}"'.format(kwargs["id"]) if "id" in kwargs else "",
-                )
-
-            if not k_in_propnames and not k_in_wildcards:
+        # pylint: disable=no-member
+        if not _props_check.get():
+            # Production mode, the props are trusted
+            for k, v in kwargs.items():
+                setattr(self, k, v)
+            return
+
+        prop_names = self._prop_names
+        for k, v in kwargs.items():
+            if k not in prop_names and not k.startswith(
+                tuple(self._valid_wildcard_attributes)
+            ):
                 raise TypeError(
                     "{} received an unexpected keyword argument: `{}`".format(
-                        error_string_prefix, k
+                        self._error_string_prefix(kwargs), k
                     )
-                    + "\nAllowed arguments: {}".format(  # pylint: disable=no-member
-                        ", ".join(sorted(self._prop_names))
+                    + "\nAllowed arguments: {}".format(
+                        ", ".join(sorted(prop_names))
                     )
                 )
 
             if k != "children" and isinstance(v, Component):
                 raise TypeError(
-                    error_string_prefix
+                    self._error_string_prefix(kwargs)
                     + " detected a Component for a prop other than `children`\n"
                     + "Did you forget to wrap multiple `children` in an array?\n"
                     + "Prop {} has value {}\n".format(k, repr(v))
@@ -150,31 +169,69 @@ class Component(with_metaclass(ComponentMeta, object)):
 
             setattr(self, k, v)
 
+    def _error_string_prefix(self, kwargs):
+        """The start of the error messages about the props, only formatted
+        when there is an error."""
+        # pylint: disable=no-member
+        # e.g. "The dash_core_components.Dropdown component (version 1.6.0)
+        # with the ID "my-dropdown"
+        try:
+            return "The `{}.{}` component (version {}){}".format(
+                self._namespace,
+                self._type,
+                getattr(__import__(self._namespace), "__version__", "unknown"),
+                ' with the ID "{}"'.format(kwargs["id"]) if "id" in kwargs else "",
+            )
+        except ImportError:
+            # Our tests create mock components with libraries that
+            # aren't importable
+            return "The `{}` component{}".format(
+                self._type,
+                ' with the ID "{}"'.format(kwargs["id"]) if "id" in kwargs else "",
+            )
+
     def to_plotly_json(self):
-        # Add normal properties
-        props = {
-            p: getattr(self, p)
-            for p in self._prop_names  # pylint: disable=no-member
-            if hasattr(self, p)
-        }
-        # Add the wildcard properties data-* and aria-*
-        props.update(
-            {
-                k: getattr(self, k)
-                for k in self.__dict__
-                if any(
-                    k.startswith(w)
-                    # pylint:disable=no-member
-                    for w in self._valid_wildcard_attributes
-                )
-            }
-        )
-        as_json = {
-            "props": props,
-            "type": self._type,  # pylint: disable=no-member
-            "namespace": self._namespace,  # pylint: disable=no-member
+        # pylint: disable=no-member
+        prop_names = self._prop_names
+        wildcards = self._valid_wildcard_attributes
+        compiled = type(self).__dict__.get("_compiled_props_json")
+        if compiled is None or not (
+            (compiled[0] is prop_names or compiled[0] == prop_names)
+            and (compiled[1] is wildcards or compiled[1] == wildcards)
+        ):
+            compiled = _compile_props_json(type(self), prop_names, wildcards)
+            type.__setattr__(type(self), "_compiled_props_json", compiled)
+
+        return {
+            "props": compiled[2](self),
+            "type": self._type,
+            "namespace": self._namespace,
         }
 
+    def _to_plotly_json_tree(self, keep_frozen=True):
+        """Get the ``to_plotly_json`` of the component with the components
+        of its children serialized too, so the whole tree is plain JSON
+        data.
+
+        With ``keep_frozen``, the frozen components of the children are kept,
+        for the encoders to reuse their JSON."""
+        as_json = self.to_plotly_json()
+        stack = [as_json["props"]]
+        while stack:
+            props = stack.pop()
+            children = props.get("children")
+            if isinstance(children, Component):
+                if not keep_frozen or children._frozen_json is None:
+                    props["children"] = children = children.to_plotly_json()
+                    if isinstance(children, dict) and isinstance(children.get("props"), dict):
+                        stack.append(children["props"])
+            elif isinstance(children, (tuple, MutableSequence)):
+                props["children"] = children = list(children)
+                for i, child in enumerate(children):
+                    if isinstance(child, Component) and (not keep_frozen or child._frozen_json is None):
+                        children[i] = child = child.to_plotly_json()
+                        if isinstance(child, dict) and isinstance(child.get("props"), dict):
+                            stack.append(child["props"])
         return as_json
 
     # pylint: disable=too-many-branches, too-many-return-statements
@@ -199,14 +256,7 @@ class Component(with_metaclass(ComponentMeta, object)):
 
             # Recursively dig into its subtree
             try:
-                if operation == "get":
-                    return self.children.__getitem__(id)
-                elif operation == "set":
-                    self.children.__setitem__(id, new_item)
-                    return
-                elif operation == "delete":
-                    self.children.__delitem__(id)
-                    return
+                return self.children._get_set_or_delete(id, operation, new_item)
             except KeyError:
                 pass
 
@@ -228,14 +278,7 @@ class Component(with_metaclass(ComponentMeta, object)):
                 # Make sure it's not like a string
                 elif isinstance(item, Component):
                     try:
-                        if operation == "get":
-                            return item.__getitem__(id)
-                        elif operation == "set":
-                            item.__setitem__(id, new_item)
-                            return
-                        elif operation == "delete":
-                            item.__delitem__(id)
-                            return
+                        return item._get_set_or_delete(id, operation, new_item)
                     except KeyError:
                         pass
 
@@ -250,57 +293,117 @@ class Component(with_metaclass(ComponentMeta, object)):
     # - __iter__
     # - __len__
 
+    def _indexed(self, id):  # pylint: disable=redefined-builtin
+        """Find the element with the given ID by the index of the tree of
+        children, built on the first lookup.
+
+        :return: ``(index, element)``, None when the tree must be searched.
+        """
+        key = _id_key(id)
+        if key is None:
+            return None
+        _check_if_has_indexable_children(self)
+
+        index = self.__dict__.get("_id_index")
+        fresh = index is None or index.root is not self
+        if fresh:
+            index = self.__dict__["_id_index"] = _IdIndex(self)
+        while True:
+            item = index.items.get(key)
+            if item is not None and _id_key(getattr(item, "id", None)) == key and index.attached(item):
+                return index, item
+            if fresh:
+                if item is None:
+                    raise KeyError(id)
+                # The same component is at several places of the tree
+                return None
+            # The tree was changed without the mapping interface
+            index = self.__dict__["_id_index"] = _IdIndex(self)
+            fresh = True
+
     def __getitem__(self, id):  # pylint: disable=redefined-builtin
         """Recursively find the element with the given ID through the tree of
         children."""
 
         # A component's children can be undefined, a string, another component,
         # or a list of components.
-        return self._get_set_or_delete(id, "get")
+        found = self._indexed(id)
+        if found is None:
+            return self._get_set_or_delete(id, "get")
+        return found[1]
 
     def __setitem__(self, id, item):  # pylint: disable=redefined-builtin
         """Set an element by its ID."""
-        return self._get_set_or_delete(id, "set", item)
+        found = self._indexed(id)
+        if found is None:
+            return self._get_set_or_delete(id, "set", item)
+        return found[0].set(found[1], item)
 
     def __delitem__(self, id):  # pylint: disable=redefined-builtin
         """Delete items by ID in the tree of children."""
-        return self._get_set_or_delete(id, "delete")
+        found = self._indexed(id)
+        if found is None:
+            return self._get_set_or_delete(id, "delete")
+        return found[0].delete(found[1])
+
+    def _walk(self):
+        """Yield the trail of each item in the tree, depth first.
+
+        The trail is the ``(item, position, parent trail)`` of the item, the
+        position being None for an item which is the children of its parent,
+        and the parent trail None for the children of the component. The
+        path of the item is only formatted when needed, by _format_path.
+        """
+        stack = []
+        component, trail = self, None
+        while True:
+            children = getattr(component, "children", None)
+            children_type = type(children)
+            if children_type is list or children_type is tuple:
+                stack.extend([(children[idx], idx, trail) for idx in range(len(children) - 1, -1, -1)])
+            elif children_type is not str and children is not None:
+                if Component in children_type.__mro__:
+                    stack.append((children, None, trail))
+                elif isinstance(children, (tuple, MutableSequence)):
+                    stack.extend([(children[idx], idx, trail) for idx in range(len(children) - 1, -1, -1)])
+
+            # Yield the items up to the next component to walk into,
+            # checked as by _is_component
+            while stack:
+                trail = stack.pop()
+                yield trail
+                if Component in type(trail[0]).__mro__:
+                    break
+            else:
+                return
+            component = trail[0]
 
     def _traverse(self):
         """Yield each item in the tree."""
-        for t in self._traverse_with_paths():
-            yield t[1]
+        for trail in self._walk():
+            yield trail[0]
 
     @staticmethod
     def _id_str(component):
         id_ = stringify_id(getattr(component, "id", ""))
         return id_ and " (id={:s})".format(id_)
 
+    @classmethod
+    def _format_path(cls, trail):
+        """Format the path of the item of the trail in the tree, see _walk."""
+        parts = []
+        while trail is not None:
+            item, idx, trail = trail
+            item_string = type(item).__name__ + cls._id_str(item)
+            parts.append(
+                "[*] " + item_string if idx is None else "[{:d}] {:s}".format(idx, item_string)
+            )
+        return "\n".join(reversed(parts))
+
     def _traverse_with_paths(self):
         """Yield each item with its path in the tree."""
-        children = getattr(self, "children", None)
-        children_type = type(children).__name__
-        children_string = children_type + self._id_str(children)
-
-        # children is just a component
-        if isinstance(children, Component):
-            yield "[*] " + children_string, children
-            # pylint: disable=protected-access
-            for p, t in children._traverse_with_paths():
-                yield "\n".join(["[*] " + children_string, p]), t
-
-        # children is a list of components
-        elif isinstance(children, (tuple, MutableSequence)):
-            for idx, i in enumerate(children):
-                list_path = "[{:d}] {:s}{}".format(
-                    idx, type(i).__name__, self._id_str(i)
-                )
-                yield list_path, i
-
-                if isinstance(i, Component):
-                    # pylint: disable=protected-access
-                    for p, t in i._traverse_with_paths():
-                        yield "\n".join([list_path, p]), t
+        for trail in self._walk():
+            yield self._format_path(trail), trail[0]
 
     def _traverse_ids(self):
         """Yield components with IDs in the tree of children."""
@@ -320,20 +423,36 @@ class Component(with_metaclass(ComponentMeta, object)):
         # The number of items is more intuitive but returning the number
         # of IDs matches __iter__ better.
         length = 0
-        if getattr(self, "children", None) is None:
-            length = 0
-        elif isinstance(self.children, Component):
-            length = 1
-            length += len(self.children)
-        elif isinstance(self.children, (tuple, MutableSequence)):
-            for c in self.children:
+        component = self
+        walk = self._walk()
+        while True:
+            children = getattr(component, "children", None)
+            if children is not None and type(children) not in (list, tuple) and (
+                type(children) in (str, int, float)
+                or not (_is_component(children) or isinstance(children, MutableSequence))
+            ):
+                # string or number
                 length += 1
-                if isinstance(c, Component):
-                    length += len(c)
-        else:
-            # string or number
-            length = 1
-        return length
+
+            # The items up to the next component
+            for trail in walk:
+                length += 1
+                if Component in type(trail[0]).__mro__:
+                    component = trail[0]
+                    break
+            else:
+                return length
+
+    def __dir__(self):
+        # The unset props of the __slots__ of the generated classes aren't
+        # attributes, like the ones of the other components
+        cls = type(self)
+        return [
+            name
+            for name in super(Component, self).__dir__()
+            if not isinstance(getattr(cls, name, None), types.MemberDescriptorType)
+            or hasattr(self, name)
+        ]
 
     def __repr__(self):
         # pylint: disable=no-member
@@ -356,6 +475,320 @@ class Component(with_metaclass(ComponentMeta, object)):
         )
 
 
+def _id_key(id):  # pylint: disable=redefined-builtin
+    """The key of the ID in the indexes, None if it can't be indexed"""
+    try:
+        key = tuple(sorted(id.items())) if isinstance(id, dict) else id
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class _IdIndex(object):
+    """Index of the elements with IDs in the tree of children of a component,
+    for the mapping interface.
+
+    The parent and the position of each element are kept too, the position
+    being None for the element which is the children of its parent. They are
+    checked up to the root on each lookup, as the tree can be changed without
+    the mapping interface.
+    """
+
+    __slots__ = ("root", "items", "links")
+
+    def __init__(self, root):
+        self.root = root
+        self.items = {}  # The first element of the tree with each ID
+        self.links = {}  # id() of the elements to (element, parent, position)
+        self.add(root)
+
+    def _add(self, item, parent, position):
+        unique = True
+        key = _id_key(getattr(item, "id", None))
+        if key is not None:
+            if key in self.items:
+                unique = False
+            else:
+                self.items[key] = item
+        elif not _is_component(item):
+            return unique
+        self.links[id(item)] = (item, parent, position)
+        return unique
+
+    def add(self, item, parent=None, position=None):
+        """Index the element in its parent, and its tree of children.
+
+        :return: False if an ID was already indexed, so the first of the
+            elements with this ID isn't known.
+        """
+        unique = parent is None or self._add(item, parent, position)
+        if _is_component(item):
+            # pylint: disable=protected-access
+            # In the order of _get_set_or_delete, the first element with an ID wins
+            for child, child_position, trail in item._walk():
+                unique = self._add(child, item if trail is None else trail[0], child_position) and unique
+        return unique
+
+    def remove(self, item):
+        """Remove the element and its tree of children from the index."""
+        # pylint: disable=protected-access
+        walk = (trail[0] for trail in item._walk()) if _is_component(item) else ()
+        for element in itertools.chain((item,), walk):
+            key = _id_key(getattr(element, "id", None))
+            if key is not None and self.items.get(key) is element:
+                del self.items[key]
+            link = self.links.get(id(element))
+            if link is not None and link[0] is element:
+                del self.links[id(element)]
+
+    def attached(self, item):
+        """Whether the element is still at its indexed place in the tree"""
+        while item is not self.root:
+            link = self.links.get(id(item))
+            if link is None or link[0] is not item:
+                return False
+            _, parent, position = link
+            children = getattr(parent, "children", None)
+            if position is None:
+                if children is not item:
+                    return False
+            elif not (
+                isinstance(children, (tuple, MutableSequence))
+                and position < len(children)
+                and children[position] is item
+            ):
+                return False
+            item = parent
+        return True
+
+    def set(self, item, new_item):
+        """Replace the indexed element by the new one in its parent."""
+        _, parent, position = self.links[id(item)]
+        if position is None:
+            parent.children = new_item
+        else:
+            parent.children[position] = new_item
+
+        self.remove(item)
+        if not self.add(new_item, parent, position):
+            # Find the first of the elements with the same ID again
+            self.root.__dict__.pop("_id_index", None)
+
+    def delete(self, item):
+        """Delete the indexed element from its parent."""
+        _, parent, position = self.links[id(item)]
+        if position is None:
+            parent.children = None
+        else:
+            del parent.children[position]
+
+        self.remove(item)
+        if position is not None:
+            # The next children moved
+            children = parent.children
+            for i in range(position, len(children)):
+                child = children[i]
+                link = self.links.get(id(child))
+                if link is not None and link[0] is child:
+                    self.links[id(child)] = (child, parent, i)
+
+
+@functools.lru_cache(maxsize=None)
+def _slot_names(component_class):
+    """The names of the ``__slots__`` of the component class."""
+    names = []
+    for cls in component_class.__mro__:
+        slots = cls.__dict__.get("__slots__", ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name not in ("__dict__", "__weakref__") and name not in names:
+                names.append(name)
+    return tuple(names)
+
+
+def _shallow_copy(component):
+    """Copy the component, not frozen, with a new list of its children."""
+    cls = type(component)
+    if component._frozen_json is not None:
+        cls = cls.__bases__[0]
+    copy = cls.__new__(cls)
+    for name in _slot_names(cls):
+        try:
+            setattr(copy, name, getattr(component, name))
+        except AttributeError:
+            pass
+    for name, value in getattr(component, "__dict__", {}).items():
+        if name not in ("_frozen_json", "_id_index"):
+            setattr(copy, name, value)
+
+    children = getattr(copy, "children", None)
+    if isinstance(children, (tuple, MutableSequence)) and not isinstance(children, str):
+        copy.children = list(children)
+    return copy
+
+
+def freeze(component):
+    """Make the component and the components of its children immutable,
+    so their JSON is encoded once and reused by the responses.
+
+    The props can't be set or deleted anymore and the lists of children
+    become tuples. The values of the props, like ``style`` dicts, must
+    not be changed either.
+
+    :return: The component.
+    """
+    components = [component] + [c for c in component._traverse() if isinstance(c, Component)]
+    for item in components:
+        if item._frozen_json is not None:
+            continue
+        children = getattr(item, "children", None)
+        if isinstance(children, MutableSequence):
+            item.children = tuple(children)
+        # The JSON of the component by the encoder functions
+        item._frozen_json = {}
+        item.__class__ = _frozen_class(item.__class__)
+    return component
+
+
+def template(component):
+    """Freeze the component as the template of the layouts built from it
+    by ``clone_with()``, see ``freeze()``.
+
+    :return: The component.
+    """
+    return freeze(component)
+
+
+def clone_with(component, changes=None, props=None):
+    """Get a copy of the component tree with some props changed, sharing
+    the unchanged components, and their JSON when they are frozen.
+
+    Only the changed components and their ancestors are copied, the
+    copies aren't frozen and their lists of children are new lists.
+    The shared components must not be changed, which ``template()``
+    ensures.
+
+    :param changes: ``{id: {prop: value}}`` of the components of the
+        tree of children to change.
+    :param props: ``{prop: value}`` of the component to change.
+    :return: The copy.
+    """
+    root = _shallow_copy(component)
+    if props:
+        Component.__init__(root, **props)
+    if not changes:
+        return root
+
+    wanted = {_id_key(id): id for id in changes}
+    found = {}
+    for trail in component._walk():
+        item_id = getattr(trail[0], "id", None)
+        if item_id is not None:
+            key = _id_key(item_id)
+            # The first component with the ID, as by __getitem__
+            if key in wanted and key not in found:
+                found[key] = trail
+                if len(found) == len(wanted):
+                    break
+    for key in wanted:
+        if key not in found:
+            raise KeyError(wanted[key])
+
+    # The copies by trail, kept with the trails so their IDs stay unique
+    copies = {}
+    for trail in found.values():
+        # The trails up to the first copied ancestor, copied downwards
+        chain = []
+        while trail is not None and id(trail) not in copies:
+            chain.append(trail)
+            trail = trail[2]
+        parent = root if trail is None else copies[id(trail)][1]
+        for trail in reversed(chain):
+            item, position = trail[0], trail[1]
+            copy = _shallow_copy(item)
+            if position is None:
+                parent.children = copy
+            else:
+                parent.children[position] = copy
+            copies[id(trail)] = (trail, copy)
+            parent = copy
+    # Once all copied, the new children of a component replacing the ones copied
+    for key, trail in found.items():
+        Component.__init__(copies[id(trail)][1], **changes[wanted[key]])
+    return root
+
+
+def _frozen_setattr(self, name, value):
+    raise AttributeError("Can't set `{}` of the frozen `{}` component".format(name, self._type))
+
+
+def _frozen_delattr(self, name):
+    raise AttributeError("Can't delete `{}` of the frozen `{}` component".format(name, self._type))
+
+
+def _frozen_setitem(self, id, item):  # pylint: disable=redefined-builtin
+    raise TypeError("Can't set the children of the frozen `{}` component".format(self._type))
+
+
+def _frozen_delitem(self, id):  # pylint: disable=redefined-builtin
+    raise TypeError("Can't delete the children of the frozen `{}` component".format(self._type))
+
+
+def _frozen_reduce_ex(self, protocol):  # pylint: disable=unused-argument
+    # Copied and pickled as the component not frozen, frozen again once restored
+    return freeze, (_shallow_copy(self),)
+
+
+@functools.lru_cache(maxsize=None)
+def _frozen_class(component_class):
+    """Get the immutable subclass of the component class, see freeze()"""
+    return type(component_class)(component_class.__name__, (component_class,), {
+        "__module__": component_class.__module__,
+        "__qualname__": component_class.__qualname__,
+        "__slots__": (),
+        "__doc__": component_class.__doc__,
+        "__setattr__": _frozen_setattr,
+        "__delattr__": _frozen_delattr,
+        "__setitem__": _frozen_setitem,
+        "__delitem__": _frozen_delitem,
+        "__reduce_ex__": _frozen_reduce_ex,
+    })
+
+
+def _compile_props_json(component_class, prop_names, wildcards):
+    """Generate the function getting the props of the components of the
+    class, the set ones of ``prop_names`` and the wildcard ones.
+
+    :return: ``(prop_names, wildcards, function)``
+    """
+    lines = ["def props_json(self):", "    d = self.__dict__", "    props = {}"]
+    for prop_name in prop_names:
+        if hasattr(component_class, prop_name):
+            # A class attribute or a property, as by getattr
+            lines.extend([
+                "    try:",
+                "        props[{0!r}] = getattr(self, {0!r})".format(prop_name),
+                "    except AttributeError:",
+                "        pass",
+            ])
+        else:
+            lines.extend([
+                "    if {0!r} in d:".format(prop_name),
+                "        props[{0!r}] = d[{0!r}]".format(prop_name),
+            ])
+    if wildcards:
+        lines.extend([
+            "    for k in d:",
+            "        if k.startswith({!r}):".format(tuple(wildcards)),
+            "            props[k] = d[k]",
+        ])
+    lines.append("    return props")
+
+    namespace = {}
+    exec("\n".join(lines), namespace)  # pylint: disable=exec-used
+    return prop_names, wildcards, namespace["props_json"]
+
+
 def _explicitize_args(func):
     # Python 2
     if hasattr(func, "func_code"):
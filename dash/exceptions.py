@@ -47,6 +47,10 @@ class InvalidCallbackReturnValue(CallbackException):
     pass
 
 
+class FrozenCallbacksError(CallbackException):
+    pass
+
+
 class InvalidConfig(DashException):
     pass
 
@@ -0,0 +1,26 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from dash.staticfiles.compress import ENCODINGS, compress_component_suites
+from dash.staticfiles.finders import _import_module
+
+
+class Command(BaseCommand):
+    help = 'Write the precompressed variants of the JS, CSS and map resources of the Dash component suites.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('packages', nargs='*', metavar='package',
+                            help='Component packages to compress, all the registered ones by default.')
+        parser.add_argument('--force', action='store_true',
+                            help='Compress the resources even if the variants are up to date.')
+
+    def handle(self, *args, **options):
+        # Import all modules that Dash components were registered in ComponentRegistry
+        for app in apps.app_configs.keys():
+            _import_module(app, 'views')
+
+        written = compress_component_suites(options['packages'] or None, force=options['force'])
+        if options['verbosity'] > 1:
+            for filename in written:
+                self.stdout.write(filename)
+        self.stdout.write('{} file(s) written ({}).'.format(len(written), ', '.join(ENCODINGS)))
@@ -1,6 +1,5 @@
 from __future__ import print_function
 
-import json
 import time
 import types
 
@@ -12,7 +11,7 @@ else:
     from django.utils.deprecation import MiddlewareMixin
 
 from . import exceptions  # noqa: F402 pylint: disable=wrong-import-position
-from ._utils import inputs_to_dict, split_callback_id
+from ._callback_context import callback_context
 
 
 class HttpResponseNoContent(HttpResponse):
@@ -58,21 +57,12 @@ class CommonMiddleware(MiddlewareMixin):  # pylint: disable=too-few-public-metho
         }
 
     def process_request(self, request):
-        if '/_dash-update-component' not in request.path:
+        if request.method != 'POST' or '/_dash-update-component' not in request.path:
             return None
 
-        body = json.loads(request.body)
-        request.inputs_list = body.get('inputs', [])
-        request.states_list = body.get('state', [])
-        request.output = body['output']
-        request.outputs_list = body.get('outputs', []) or split_callback_id(request.output)
-
-        request.input_values = inputs_to_dict(request.inputs_list)
-        request.state_values = inputs_to_dict(request.states_list)
-        changed_props = body.get('changedPropIds', [])
-        request.triggered_inputs = [
-            {'prop_id': x, 'value': request.input_values.get(x)} for x in changed_props
-        ]
+        # The body is parsed when it's first accessed, the update view setting
+        # the values of the callback context on the request before the callback
+        callback_context(request)
         # self._set_record_timing(request)
 
     # def process_response(self, request, response):
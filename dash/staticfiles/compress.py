@@ -0,0 +1,157 @@
+""" Precompressed variants of the component suites resources.
+
+The ``.gz`` and ``.br`` siblings are written at build time, by the
+``compress_dash_suites`` management command or by ``collectstatic`` with the
+``CompressedDashComponentSuitesFinder``, and served by the views to the clients
+accepting them.
+"""
+import gzip
+import importlib
+import importlib.util
+import os
+import re
+import sys
+from collections import OrderedDict
+
+from dash.development.base_component import ComponentRegistry
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+EXTENSIONS = ('.js', '.css', '.map')
+
+
+def _gzip(data):
+    # mtime=0 so the same resource gives the same bytes on every build
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+# The suffixes of the content codings, in the order of preference
+SUFFIXES = OrderedDict([('br', '.br'), ('gzip', '.gz')])
+
+# The content codings that can be written here
+ENCODINGS = OrderedDict()
+if brotli is not None:
+    ENCODINGS['br'] = brotli.compress
+ENCODINGS['gzip'] = _gzip
+
+_re_coding = re.compile(r'^\s*([^\s;]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$')
+
+
+def accepted_encodings(accept_encoding):
+    """Get the set of content codings accepted by the ``Accept-Encoding``
+    header, without the ones refused with ``q=0``.
+    """
+    accepted = set()
+    for coding in accept_encoding.lower().split(','):
+        match = _re_coding.match(coding)
+        if not match:
+            continue
+        name, quality = match.groups()
+        try:
+            if quality is not None and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(name)
+
+    if '*' in accepted:
+        accepted.update(SUFFIXES)
+    return accepted
+
+
+def compressed_siblings(filename, mtime=None):
+    """Get the fresh precompressed siblings of the file.
+
+    :return: ``OrderedDict`` of the content coding to the sibling filename,
+        in the order of preference.
+    """
+    if mtime is None:
+        mtime = os.stat(filename).st_mtime
+
+    siblings = OrderedDict()
+    for encoding, suffix in SUFFIXES.items():
+        sibling = filename + suffix
+        try:
+            if os.stat(sibling).st_mtime >= mtime:
+                siblings[encoding] = sibling
+        except OSError:
+            pass
+    return siblings
+
+
+def compress_file(filename, destination=None, force=False):
+    """Write the ``.gz`` and ``.br`` (when brotli is installed) variants of
+    the file next to it, or next to ``destination``.
+
+    A variant is only written when it's missing or older than the file.
+
+    :return: The list of the written files.
+    """
+    destination = destination or filename
+    mtime = os.stat(filename).st_mtime
+    written = []
+    data = None
+    for encoding, compress in ENCODINGS.items():
+        target = destination + SUFFIXES[encoding]
+        if not force and os.path.isfile(target) and os.stat(target).st_mtime >= mtime:
+            continue
+
+        if data is None:
+            with open(filename, 'rb') as f:
+                data = f.read()
+        with open(target, 'wb') as f:
+            f.write(compress(data))
+        written.append(target)
+    return written
+
+
+def _resource_paths(resources):
+    for resource in resources:
+        for key in ('relative_package_path', 'dev_package_path'):
+            paths = resource.get(key)
+            # A path, a list of paths, or the prod and dev paths
+            for mode_paths in paths.values() if isinstance(paths, dict) else [paths]:
+                if isinstance(mode_paths, str):
+                    yield mode_paths
+                else:
+                    for path in mode_paths or ():
+                        yield path
+
+
+def resource_files(package_name):
+    """Get the filenames of the JS, CSS and map resources registered by the
+    component package.
+    """
+    package = sys.modules.get(package_name) or importlib.import_module(package_name)
+    resources = list(getattr(package, '_js_dist', ())) + list(getattr(package, '_css_dist', ()))
+    resources.extend(getattr(package, '_js_dist_dependencies', ()))
+
+    root = os.path.dirname(package.__file__)
+    filenames = []
+    for path in _resource_paths(resources):
+        filename = os.path.join(root, *path.split('/'))
+        if filename not in filenames and filename.endswith(EXTENSIONS) and os.path.isfile(filename):
+            filenames.append(filename)
+    return filenames
+
+
+def compress_component_suites(package_names=None, force=False):
+    """Write the precompressed variants of the resources of the component
+    packages, all the registered ones by default.
+
+    :return: The list of the written files.
+    """
+    if package_names is None:
+        package_names = sorted(c for c in ComponentRegistry.registry if c != '__builtin__')
+        if 'dash_renderer' not in package_names and importlib.util.find_spec('dash_renderer'):
+            package_names.append('dash_renderer')
+
+    written = []
+    for package_name in package_names:
+        for filename in resource_files(package_name):
+            written.extend(compress_file(filename, force=force))
+    return written
@@ -14,6 +14,7 @@ from django.core.files.storage import FileSystemStorage
 
 from dash.development.base_component import ComponentRegistry
 from dash.fingerprint import build_fingerprint
+from dash.staticfiles.compress import EXTENSIONS, ENCODINGS, SUFFIXES, compress_file
 
 
 def _import_module(pkg, m):
@@ -38,7 +39,7 @@ class DashStorage(FileSystemStorage):
 
 class DashComponentSuitesFinder(FileSystemFinder):
     prefix = '_dash-component-suites/'
-    ignore_patterns = ['*.py', '*.pyc', '*.json']
+    ignore_patterns = ['*.py', '*.pyc', '*.json', '*.gz', '*.br']
 
     def __init__(self, *args, **kwargs):  # pylint: disable=super-init-not-called
         # Import all modules that Dash components were registered in ComponentRegistry
@@ -78,3 +79,20 @@ class DashComponentSuitesFinder(FileSystemFinder):
                 with temp_storage.open(path) as source_file:
                     temp_storage.save(f'{new_file_name}_.{ext}', source_file)
                 yield new_path, storage
+
+
+class CompressedDashComponentSuitesFinder(DashComponentSuitesFinder):
+    """ Also collect the gzip and brotli (when installed) variants of the
+    JS, CSS and map files, to be served by the web server.
+    """
+
+    def list(self, ignore_patterns):
+        for new_path, storage in super().list(ignore_patterns):
+            yield new_path, storage
+
+            if new_path.endswith(EXTENSIONS):
+                # The variants are compressed from the temporary copy, and opened by DashStorage
+                new_file_name, ext = new_path.rsplit('.', 1)
+                compress_file(storage.path(f'{new_file_name}_.{ext}'), destination=storage.path(f'{new_path}_'))
+                for encoding in ENCODINGS:
+                    yield new_path + SUFFIXES[encoding], storage
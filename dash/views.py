@@ -1,20 +1,35 @@
 from __future__ import print_function
 
+import contextvars
+import gzip
+import hashlib
 import logging
+import re
 import sys
-
-import plotly
+import threading
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
 
 from django.apps import apps
-from django.http import HttpResponse
+from django.http import HttpResponse, FileResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import TemplateView
+from django.views.generic.base import ContextMixin
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
-from django.http import JsonResponse as BaseJsonResponse
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.template.loader import select_template
+from django.utils.cache import patch_vary_headers
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag, http_date, parse_etags
 
 from .dash import Dash
-from ._utils import generate_hash
+from .development.base_component import _props_check
+from ._callback_context import set_request_attributes
+from ._utils import generate_hash, iter_json, sync_to_async, to_json
+from .staticfiles.compress import accepted_encodings
 
 
 __all__ = (
@@ -25,12 +40,184 @@ __all__ = (
 
 logger = logging.getLogger('dj_plotly_dash')
 
+# In-process cache of the layouts, see BaseDashView.dash_layout_cache_key
+_layout_cache = LocMemCache('dash-layout', {})
+
+# Request-bound state of the views, see BaseDashView._dash_bind
+_request_state = contextvars.ContextVar('dash_request_state', default=None)
+
+
+class JsonResponse(HttpResponse):
+    """JSON response encoded by the DASH_JSON_ENCODER setting."""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super(JsonResponse, self).__init__(content=to_json(data), **kwargs)
+
+
+class _RequestLocal(object):
+    """View attribute stored per request, so one compiled view instance can
+    serve concurrent requests (threads under WSGI, tasks under ASGI).
+
+    Callbacks of a shared Dash app may be bound to another view instance
+    than the one serving the request, so the state is not kept per view.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
 
-class JsonResponse(BaseJsonResponse):
-    def __init__(self, data, encoder=plotly.utils.PlotlyJSONEncoder, safe=False,
-                 json_dumps_params=None, **kwargs):
-        super(JsonResponse, self).__init__(data, encoder=encoder, safe=safe,
-                                           json_dumps_params=json_dumps_params, **kwargs)
+        state = _request_state.get()
+        if state is not None and self.name in state:
+            return state[self.name]
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name)
+
+    def __set__(self, instance, value):
+        state = _request_state.get()
+        if state is None:
+            instance.__dict__[self.name] = value
+        else:
+            state[self.name] = value
+
+
+# The gzipped contents by ETag and level, the least recently used first
+_gzip_cache = OrderedDict()
+_gzip_cache_lock = threading.Lock()
+_gzip_cache_size = 64
+
+
+def _gzip_static(content, etag, level=6):
+    """Gzip the content, cached by its ETag: the contents cached by Django
+    are new bytes objects, which aren't hashed or kept here."""
+    key = (etag, level)
+    with _gzip_cache_lock:
+        gzipped = _gzip_cache.get(key)
+        if gzipped is not None:
+            _gzip_cache.move_to_end(key)
+            return gzipped
+
+    gzipped = gzip.compress(content, compresslevel=level, mtime=0)
+    with _gzip_cache_lock:
+        _gzip_cache[key] = gzipped
+        while len(_gzip_cache) > _gzip_cache_size:
+            _gzip_cache.popitem(last=False)
+    return gzipped
+
+
+def _chunks(content, chunk_size=64 * 1024):
+    view = memoryview(content)
+    for start in range(0, len(content), chunk_size):
+        yield view[start:start + chunk_size]
+
+
+def _gzip_chunks(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    for chunk in chunks:
+        chunk = compressor.compress(chunk)
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
+def _accepts_gzip(request):
+    return 'gzip' in accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+
+def _compress_response(request, response, level=6, min_size=200, streaming_size=0):
+    """Gzip the content of the response for the clients accepting it.
+
+    Content of ``streaming_size`` bytes or more is compressed while streamed
+    to the client, 0 to disable. Streaming responses are compressed whatever
+    their size.
+    """
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if (response.has_header('Content-Encoding') or response.status_code != 200 or
+            (not response.streaming and len(response.content) < min_size) or not _accepts_gzip(request)):
+        return response
+
+    if response.streaming:
+        response.streaming_content = _gzip_chunks(response.streaming_content, level)
+        del response['Content-Length']
+    elif streaming_size and len(response.content) >= streaming_size:
+        streaming_response = StreamingHttpResponse(_gzip_chunks(_chunks(response.content), level))
+        for header, value in response.items():
+            if header.lower() != 'content-length':
+                streaming_response[header] = value
+        streaming_response.cookies = response.cookies
+        response = streaming_response
+    else:
+        response.content = gzip.compress(response.content, compresslevel=level, mtime=0)
+        response['Content-Length'] = str(len(response.content))
+    response['Content-Encoding'] = 'gzip'
+    return response
+
+
+def _set_json_content(response, data):
+    """Set the content of the response to the data encoded by the
+    DASH_JSON_ENCODER setting, or streamed while it's encoded.
+    """
+    if response.streaming:
+        response.streaming_content = iter_json(data)
+    else:
+        response.content = to_json(data)
+    return response
+
+
+def _etag_response(request, content, etag, content_type='application/json', compress=False, level=6, min_size=200):
+    """Response with the content, or 304 if the client has the same ETag.
+
+    With ``compress`` the gzipped content is cached and served to the clients
+    accepting it.
+    """
+    gzipped = compress and len(content) >= min_size and _accepts_gzip(request)
+    gzip_etag = etag
+    etag = quote_etag(etag + '-gzip' if gzipped else etag)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        if gzipped:
+            response = HttpResponse(_gzip_static(content, gzip_etag, level), content_type=content_type)
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(content, content_type=content_type)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    if compress:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+_re_byte_range = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _byte_range(request, size, etag):
+    """Get the (start, stop) of a single byte range of the request, None
+    to serve the whole content, or False if the range isn't satisfiable.
+    """
+    match = _re_byte_range.match(request.META.get('HTTP_RANGE', '').strip())
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not match or not any(match.groups()) or (if_range and etag not in parse_etags(if_range)):
+        return None
+
+    start, end = match.groups()
+    if not start:
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+    if start > end:
+        return False
+    return start, end + 1
+
+
+def _async_csrf_exempt(view_func):
+    """csrf_exempt of Django < 4.1 wraps async views into sync ones."""
+    view_func.csrf_exempt = True
+    return view_func
 
 
 class MetaDashView(type):
@@ -62,6 +249,45 @@ class MetaDashView(type):
                 new_cls.dash_cache_max_age = getattr(settings, 'DASH_CACHE_MAX_AGE', 0)
             except ImproperlyConfigured:
                 new_cls.dash_cache_max_age = 0
+        if new_cls.__dict__.get('dash_view_cache', None) is None:
+            try:
+                new_cls.dash_view_cache = getattr(settings, 'DASH_VIEW_CACHE', True)
+            except ImproperlyConfigured:
+                new_cls.dash_view_cache = True
+        if new_cls.__dict__.get('dash_index_etag', None) is None:
+            if new_cls.get_context_data is not ContextMixin.get_context_data:
+                # The ETag doesn't cover the context of the view, it must be enabled explicitly
+                new_cls.dash_index_etag = False
+            else:
+                try:
+                    new_cls.dash_index_etag = getattr(settings, 'DASH_INDEX_ETAG', True)
+                except ImproperlyConfigured:
+                    new_cls.dash_index_etag = True
+        if new_cls.__dict__.get('dash_stream_json', None) is None:
+            try:
+                new_cls.dash_stream_json = getattr(settings, 'DASH_STREAM_JSON', False)
+            except ImproperlyConfigured:
+                new_cls.dash_stream_json = False
+        if new_cls.__dict__.get('dash_props_check', None) is None:
+            try:
+                new_cls.dash_props_check = getattr(settings, 'DASH_PROPS_CHECK', None)
+            except ImproperlyConfigured:
+                new_cls.dash_props_check = None
+        if new_cls.__dict__.get('dash_compress_min_size', None) is None:
+            try:
+                new_cls.dash_compress_min_size = getattr(settings, 'DASH_COMPRESS_MIN_SIZE', 200)
+            except ImproperlyConfigured:
+                new_cls.dash_compress_min_size = 200
+        if new_cls.__dict__.get('dash_compress_level', None) is None:
+            try:
+                new_cls.dash_compress_level = getattr(settings, 'DASH_COMPRESS_LEVEL', 6)
+            except ImproperlyConfigured:
+                new_cls.dash_compress_level = 6
+        if new_cls.__dict__.get('dash_compress_streaming_size', None) is None:
+            try:
+                new_cls.dash_compress_streaming_size = getattr(settings, 'DASH_COMPRESS_STREAMING_SIZE', 0)
+            except ImproperlyConfigured:
+                new_cls.dash_compress_streaming_size = 0
 
         dash_name = new_cls.__dict__.get('dash_name', getattr(new_cls, 'dash_name', ''))
         if not dash_name:
@@ -82,6 +308,15 @@ class MetaDashView(type):
 
 class BaseDashView(TemplateView, metaclass=MetaDashView):
     _dashes = {}
+    _dash_views = OrderedDict()  # Compiled views, keyed by view class and base url
+    _dash_views_max_size = 256  # The least recently used views are dropped
+    _dash_views_lock = threading.Lock()
+
+    # Request-bound state of a compiled view
+    request = _RequestLocal('request')
+    args = _RequestLocal('args')
+    kwargs = _RequestLocal('kwargs')
+    response = _RequestLocal('response')
 
     template_name = 'dash/base.html'
     dash_base_url = '/'
@@ -96,7 +331,23 @@ class BaseDashView(TemplateView, metaclass=MetaDashView):
     dash_components = None
     dash_hot_reload = None
     dash_suppress_callback_exceptions = True
+    dash_compress = None
+    # Stream the callback outputs and the dynamic layouts while they are encoded
+    dash_stream_json = None  # getattr(settings, 'DASH_STREAM_JSON', False)
+    # Validate the props of the components built by the layouts and the callbacks, and
+    # check them in the browser with the dev bundles. None validates them on the server only
+    dash_props_check = None  # getattr(settings, 'DASH_PROPS_CHECK', None)
+    dash_compress_min_size = None  # getattr(settings, 'DASH_COMPRESS_MIN_SIZE', 200), bytes
+    dash_compress_level = None  # getattr(settings, 'DASH_COMPRESS_LEVEL', 6), gzip level from 1 to 9
+    # Bigger responses are compressed while streamed, 0 to disable
+    dash_compress_streaming_size = None  # getattr(settings, 'DASH_COMPRESS_STREAMING_SIZE', 0), bytes
     dash_cache_max_age = 0  # getattr(settings, 'DASH_CACHE_MAX_AGE', 0)
+    dash_view_cache = None  # getattr(settings, 'DASH_VIEW_CACHE', True)
+    # Disable for templates which render request dependent content. The views overriding
+    # get_context_data must enable it, the ETag only covers the Dash index and the template
+    dash_index_etag = None  # getattr(settings, 'DASH_INDEX_ETAG', True)
+    dash_layout_cache_timeout = 300  # Seconds to cache layouts, see dash_layout_cache_key
+    dash_layout_cache_alias = None  # Django cache for layouts, in-process cache if None
     dash_app_entry = """
 <div id="react-entry-point">
     <div class="_dash-loading">
@@ -117,12 +368,20 @@ class BaseDashView(TemplateView, metaclass=MetaDashView):
         dash_suppress_callback_exceptions = kwargs.pop('dash_suppress_callback_exceptions',
                                                        self.dash_suppress_callback_exceptions)
         dash_app_entry = kwargs.pop('dash_app_entry', self.dash_app_entry)
+        dash_compress = kwargs.pop('dash_compress', self.dash_compress)
+        dash_props_check = kwargs.pop('dash_props_check', self.dash_props_check)
 
         super(BaseDashView, self).__init__(**kwargs)
 
         dash = getattr(self, 'dash', None)
         if not isinstance(dash, Dash):
             self.dash = Dash()
+        elif dash.__dict__.setdefault('_dash_view_base_url', dash_base_url) != dash_base_url:
+            # A Dash app of the class is served at the base url of its first view, the views
+            # of the other base urls (like the dash_prefix ones) set the config of a copy
+            self.dash = dash.copy()
+            self.dash._dash_view_base_url = dash_base_url
+            self.dash._dash_view_classes = set()
 
         setattr(self.dash, '_res_affix', '_{}'.format(id(self.__class__)))
 
@@ -154,18 +413,52 @@ class BaseDashView(TemplateView, metaclass=MetaDashView):
             self.dash._dev_tools.hot_reload = dash_hot_reload
         if self.dash.config.suppress_callback_exceptions is not dash_suppress_callback_exceptions:
             self.dash.config.suppress_callback_exceptions = dash_suppress_callback_exceptions
+        if dash_compress is not None:
+            self.dash.config.compress = dash_compress
+        if dash_props_check is not None:
+            self.dash._dev_tools.props_check = dash_props_check
+        self.dash_props_check = dash_props_check
 
         self.dash.components = set(self.dash_components or [])
         # self.dash.dash_name = self.dash_name
         self.dash._reload_hash = self._dash_hot_reload_hash  # pylint: disable=no-member
 
         self.setup_conf()
-        self.setup_callbacks()
+        # The callbacks are registered once by view class of the app, and then frozen,
+        # registering new ones into a frozen app raises FrozenCallbacksError
+        view_classes = self.dash.__dict__.setdefault('_dash_view_classes', set())
+        if self.__class__ not in view_classes:
+            self.setup_callbacks()
+            view_classes.add(self.__class__)
 
     def get(self, request, *args, **kwargs):
+        index = self._dash_index(request, *args, **kwargs)
+
+        etag = None
+        if self.dash_index_etag:
+            etag = quote_etag(hashlib.md5(
+                '{}:{}'.format(self.dash.index_etag(), self._dash_template_hash()).encode('utf-8')
+            ).hexdigest())
+            response = get_conditional_response(request, etag=etag)
+            if response is not None:
+                return response
+
         context = self.get_context_data(**kwargs)
-        context.update(**self._dash_index(request, *args, **kwargs))
-        return self.render_to_response(context)
+        context.update(**index)
+        response = self.render_to_response(context)
+        if etag:
+            response['ETag'] = etag
+            response['Cache-Control'] = 'no-cache'
+        return response
+
+    def _dash_template_hash(self):
+        # The source of the template, so the index ETag changes with it across restarts,
+        # the token of the process if the template engine doesn't tell it
+        template = select_template(self.get_template_names(), using=self.template_engine)
+        source = getattr(getattr(template, 'template', None), 'source', None)
+        if source is None:
+            return self._dash_hot_reload_hash  # pylint: disable=no-member
+        return '{}:{}'.format(template.template.origin.name, hashlib.md5(source.encode('utf-8')).hexdigest())
 
     def setup_conf(self):
         """Setup view settings, view variables and etc here
@@ -182,39 +475,167 @@ class BaseDashView(TemplateView, metaclass=MetaDashView):
         """
         raise NotImplementedError('Not implemented dash_layout')
 
+    def dash_layout_cache_key(self, request):  # pylint: disable=unused-argument, no-self-use
+        """Get the key to cache the layout of the request by
+
+        Requests with the same key share the serialized result of the layout
+        function (or of dash_layout) for dash_layout_cache_timeout seconds.
+        None disables the cache.
+        """
+        return None
+
     @staticmethod
     def _dash_base_url(path, part):
         return path[:path.find(part) + 1]
 
+    @staticmethod
+    def _dash_index_base_url(path, kwargs):
+        sub_path = kwargs.get('path')
+        if sub_path and path.endswith('/{}/'.format(sub_path)):
+            return path[:-len(sub_path) - 1]
+        return path
+
+    @classmethod
+    def _dash_view(cls, dash_name, dash_base_url):
+        """Get the compiled view of the Dash app.
+
+        The view, its Dash app and callbacks are built once per view class
+        and base url, and then shared by all requests of the process.
+        The callbacks of the app are frozen once the view is built.
+        """
+        view_class = cls._dashes[dash_name]
+        if not view_class.dash_view_cache:
+            view = view_class(dash_base_url=dash_base_url)
+            view.dash.freeze_callbacks()
+            return view
+
+        key = (view_class, dash_base_url)
+        view = cls._dash_views.get(key)
+        if view is None:
+            with cls._dash_views_lock:
+                view = cls._dash_views.get(key)
+                if view is None:
+                    view = view_class(dash_base_url=dash_base_url)
+                    view.dash.freeze_callbacks()
+                    cls._dash_views[key] = view
+                    # Base urls with path variables compile a view by value
+                    while len(cls._dash_views) > cls._dash_views_max_size:
+                        cls._dash_views.popitem(last=False)
+        else:
+            try:
+                cls._dash_views.move_to_end(key)
+            except KeyError:
+                # Dropped by another thread meanwhile
+                pass
+        return view
+
+    @classmethod
+    async def _async_dash_view(cls, dash_name, dash_base_url):
+        view_class = cls._dashes[dash_name]
+        if view_class.dash_view_cache:
+            view = cls._dash_views.get((view_class, dash_base_url))
+            if view is not None:
+                return view
+        # Building of the view runs user code, keep it out of the event loop
+        return await sync_to_async(cls._dash_view)(dash_name, dash_base_url)
+
+    @contextmanager
+    def _dash_bind(self, request, *args, **kwargs):
+        """Bind the request to the view for the current thread or task."""
+        token = _request_state.set({})
+        props_check_token = _props_check.set(self.dash_props_check is not False)
+        try:
+            self.setup(request, *args, **kwargs)
+            yield self
+        finally:
+            _props_check.reset(props_check_token)
+            _request_state.reset(token)
+
     def _dash_index(self, request, *args, **kwargs):  # pylint: disable=unused-argument
         return self.dash.index()
 
     def _dash_dependencies(self, request, *args, **kwargs):  # pylint: disable=unused-argument
-        self.dash._generate_scripts_html()
-        self.dash._generate_css_dist_html()
-        return JsonResponse(self.dash.dependencies())
+        content, etag = self.dash.dependencies_json()
+        return self._dash_etag_response(request, content, etag)
+
+    def _dash_json_response(self):
+        if self.dash_stream_json:
+            return StreamingHttpResponse(content_type='application/json')
+        return HttpResponse(content_type='application/json')
+
+    def _dash_layout_value(self):
+        if self.dash.layout is None:
+            # The Dash app is shared by requests, so a layout of the view is not stored into it
+            return self.dash_layout()
+        return self.dash._layout_value()  # pylint: disable=protected-access
+
+    def _dash_layout_json(self):
+        if self.dash.layout is None:
+            return to_json(self._dash_layout_value()), None
+        return self.dash.layout_json()
 
     def _dash_layout(self, request, *args, **kwargs):  # pylint: disable=unused-argument
-        if not self.dash._layout:
-            self.dash.layout = self.dash_layout()
-        # TODO - Set browser cache limit - pass hash into frontend
-        return JsonResponse(self.dash._layout_value())  # pylint: disable=protected-access
+        key = None
+        dynamic = self.dash.layout is None or self.dash._layout_is_function  # pylint: disable=protected-access
+        if dynamic:
+            key = self.dash_layout_cache_key(request)
+
+        if key is None:
+            if dynamic:
+                response = _set_json_content(self._dash_json_response(), self._dash_layout_value())
+                return self._dash_compress_response(request, response)
+            content, etag = self._dash_layout_json()
+        else:
+            cache = caches[self.dash_layout_cache_alias] if self.dash_layout_cache_alias else _layout_cache
+            key = 'dash-layout:{}.{}:{}:{}'.format(
+                self.__class__.__module__, self.__class__.__qualname__, self.dash.config.url_base_pathname,
+                hashlib.md5(str(key).encode('utf-8')).hexdigest()
+            )
+            cached = cache.get(key)
+            if cached is None:
+                content = self._dash_layout_json()[0]
+                cached = (content, hashlib.md5(content).hexdigest())
+                cache.set(key, cached, self.dash_layout_cache_timeout)
+            content, etag = cached
+
+        return self._dash_etag_response(request, content, etag)
 
     def _dash_upd_component(self, request, *args, **kwargs):  # pylint: disable=unused-argument
-        output = request.output
-        outputs = request.outputs_list
-        inputs = request.inputs_list
-        state = request.states_list
-
-        self.response = JsonResponse({})  # pylint: disable=attribute-defined-outside-init
+        context = set_request_attributes(request)
+        output = context.output
+        outputs = context.outputs_list
+        inputs = context.inputs_list
+        state = context.states_list
+
+        # The callbacks can set the headers and the cookies of the response
+        self.response = self._dash_json_response()  # pylint: disable=attribute-defined-outside-init
         output_value, dash_response = self.dash.update_component(output, outputs, inputs, state)
-        self.response.content = JsonResponse(dash_response).content
-        return self.response
+        _set_json_content(self.response, dash_response)
+        return self._dash_compress_response(request, self.response)
+
+    async def _async_dash_upd_component(self, request, *args, **kwargs):  # pylint: disable=unused-argument
+        context = set_request_attributes(request)
+        output = context.output
+        outputs = context.outputs_list
+        inputs = context.inputs_list
+        state = context.states_list
+
+        self.response = self._dash_json_response()  # pylint: disable=attribute-defined-outside-init
+        output_value, dash_response = await self.dash.async_update_component(output, outputs, inputs, state)
+        _set_json_content(self.response, dash_response)
+        return self._dash_compress_response(request, self.response)
+
+    def _dash_compress_response(self, request, response):
+        if not self.dash.config.compress:
+            return response
+        return _compress_response(request, response, self.dash_compress_level, self.dash_compress_min_size,
+                                  self.dash_compress_streaming_size)
+
+    def _dash_etag_response(self, request, content, etag):
+        return _etag_response(request, content, etag, compress=self.dash.config.compress,
+                              level=self.dash_compress_level, min_size=self.dash_compress_min_size)
 
     def _dash_component_suites(self, request, *args, **kwargs):  # pylint: disable=unused-argument
-        self.dash._generate_scripts_html()
-        self.dash._generate_css_dist_html()
-
         ext = kwargs.get('fingerprinted_path', '').split('.')[-1]
         mimetype = {
             'js': 'application/javascript',
@@ -222,12 +643,68 @@ class BaseDashView(TemplateView, metaclass=MetaDashView):
             'map': 'application/json',
         }[ext]
 
-        response = HttpResponse(self.dash.serve_component_suites(*args, **kwargs), content_type=mimetype)
+        _, has_fingerprint, stats = self.dash.component_suite_file(kwargs['package_name'],
+                                                                   kwargs['fingerprinted_path'])
+        if stats is None:
+            # Not on the file system (e.g. zipped package)
+            self.dash._generate_scripts_html()
+            self.dash._generate_css_dist_html()
+            response = HttpResponse(self.dash.serve_component_suites(*args, **kwargs), content_type=mimetype)
+        else:
+            variant, encoding = self._dash_component_suite_variant(request, stats)
+            response = self._dash_component_suite_file(request, variant, mimetype, encoding)
+            if stats.encodings and self.dash.config.compress:
+                patch_vary_headers(response, ('Accept-Encoding',))
+
+        if has_fingerprint:
+            # Fingerprinted resources are good forever, the fingerprint changes with each build
+            response['Cache-Control'] = 'public, max-age=31536000, immutable'
         # response['Cache-Control'] = 'public, max-age={}'.format(self.dash.config.components_cache_max_age)
-        if self.dash_cache_max_age:
+        elif self.dash_cache_max_age:
             response['Cache-Control'] = 'public, max-age={}'.format(self.dash_cache_max_age)
         return response
 
+    def _dash_component_suite_variant(self, request, stats):
+        """Get the precompressed variant of the file accepted by the client
+        and its content coding, or the file itself and None.
+
+        The byte ranges are served from the file itself.
+        """
+        if self.dash.config.compress and stats.encodings and 'HTTP_RANGE' not in request.META:
+            accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+            for encoding, variant in stats.encodings.items():
+                if encoding in accepted:
+                    return variant, encoding
+        return stats, None
+
+    @staticmethod
+    def _dash_component_suite_file(request, stats, mimetype, encoding=None):
+        etag = quote_etag(stats.etag)
+        response = get_conditional_response(request, etag=etag, last_modified=int(stats.mtime))
+        if response is None:
+            byte_range = _byte_range(request, stats.size, etag)
+            if byte_range is False:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = 'bytes */{}'.format(stats.size)
+            elif byte_range:
+                start, stop = byte_range
+                with open(stats.filename, 'rb') as f:
+                    f.seek(start)
+                    response = HttpResponse(f.read(stop - start), content_type=mimetype, status=206)
+                response['Content-Range'] = 'bytes {}-{}/{}'.format(start, stop - 1, stats.size)
+            else:
+                # The file is streamed by wsgi.file_wrapper (sendfile) when the server supports it
+                response = FileResponse(open(stats.filename, 'rb'), content_type=mimetype)
+                if encoding:
+                    # Not inline as the .gz/.br file
+                    del response['Content-Disposition']
+                    response['Content-Encoding'] = encoding
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(stats.mtime)
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
     def _dash_routes(self, request, *args, **kwargs):  # pylint: disable=unused-argument
         return JsonResponse(self.dash.serve_routes(*args, **kwargs))
 
@@ -242,52 +719,109 @@ class BaseDashView(TemplateView, metaclass=MetaDashView):
     @classmethod
     def serve_dash_index(cls, request, dash_name, *args, **kwargs):
         logger.debug('serve_dash_index')
-        view = cls._dashes[dash_name](dash_base_url=request.path)
-        view.setup(request, *args, **kwargs)
-        return view.get(request, *args, **kwargs)   # pylint: disable=protected-access
+        view = cls._dash_view(dash_name, cls._dash_index_base_url(request.path, kwargs))
+        with view._dash_bind(request, *args, **kwargs):   # pylint: disable=protected-access
+            return view.get(request, *args, **kwargs)
 
     @classmethod
     def serve_dash_dependencies(cls, request, dash_name, *args, **kwargs):
         logger.debug('serve_dash_dependencies')
-        view = cls._dashes[dash_name](dash_base_url=cls._dash_base_url(request.path, '/_dash-dependencies'))
-        view.setup(request, *args, **kwargs)
-        return view._dash_dependencies(request, *args, **kwargs)   # pylint: disable=protected-access
+        view = cls._dash_view(dash_name, cls._dash_base_url(request.path, '/_dash-dependencies'))
+        with view._dash_bind(request, *args, **kwargs):   # pylint: disable=protected-access
+            return view._dash_dependencies(request, *args, **kwargs)   # pylint: disable=protected-access
 
     @classmethod
     def serve_dash_layout(cls, request, dash_name, *args, **kwargs):
         logger.debug('serve_dash_layout')
-        view = cls._dashes[dash_name](dash_base_url=cls._dash_base_url(request.path, '/_dash-layout'))
-        view.setup(request, *args, **kwargs)
-        return view._dash_layout(request, *args, **kwargs)   # pylint: disable=protected-access
+        view = cls._dash_view(dash_name, cls._dash_base_url(request.path, '/_dash-layout'))
+        with view._dash_bind(request, *args, **kwargs):   # pylint: disable=protected-access
+            return view._dash_layout(request, *args, **kwargs)   # pylint: disable=protected-access
 
     @classmethod
     @csrf_exempt
     def serve_dash_upd_component(cls, request, dash_name, *args, **kwargs):
         logger.debug('serve_dash_upd_component')
-        view = cls._dashes[dash_name](dash_base_url=cls._dash_base_url(request.path, '/_dash-update-component'))
-        view.setup(request, *args, **kwargs)
-        return view._dash_upd_component(request, *args, **kwargs)   # pylint: disable=protected-access
+        view = cls._dash_view(dash_name, cls._dash_base_url(request.path, '/_dash-update-component'))
+        with view._dash_bind(request, *args, **kwargs):   # pylint: disable=protected-access
+            return view._dash_upd_component(request, *args, **kwargs)   # pylint: disable=protected-access
 
     @classmethod
     def serve_dash_component_suites(cls, request, dash_name, *args, **kwargs):
         logger.debug('serve_dash_component_suites')
-        view = cls._dashes[dash_name](dash_base_url=cls._dash_base_url(request.path, '/_dash-component-suites'))
+        view = cls._dash_view(dash_name, cls._dash_base_url(request.path, '/_dash-component-suites'))
         return view._dash_component_suites(request, *args, **kwargs)   # pylint: disable=protected-access
 
     @classmethod
     def serve_dash_routes(cls, request, dash_name, *args, **kwargs):
         logger.debug('serve_dash_routes')
-        view = cls._dashes[dash_name](dash_base_url=cls._dash_base_url(request.path, '/_dash-routes'))
+        view = cls._dash_view(dash_name, cls._dash_base_url(request.path, '/_dash-routes'))
         return view._dash_routes(request, *args, **kwargs)   # pylint: disable=protected-access
 
     @classmethod
     def serve_reload_hash(cls, request, dash_name, *args, **kwargs):
         logger.debug('serve_reload_hash')
-        view = cls._dashes[dash_name](dash_base_url=cls._dash_base_url(request.path, '/_reload-hash'))
+        view = cls._dash_view(dash_name, cls._dash_base_url(request.path, '/_reload-hash'))
         return view._dash_reload_hash(request, *args, **kwargs)   # pylint: disable=protected-access
 
     @classmethod
     def serve_default_favicon(cls, request, dash_name, *args, **kwargs):
         logger.debug('serve_default_favicon')
-        view = cls._dashes[dash_name](dash_base_url=cls._dash_base_url(request.path, '/_favicon.ico'))
+        view = cls._dash_view(dash_name, cls._dash_base_url(request.path, '/_favicon.ico'))
+        return view._dash_default_favicon(request, *args, **kwargs)   # pylint: disable=protected-access
+
+    # Async views for ASGI deployments, see dash.async_urls
+
+    @classmethod
+    async def async_serve_dash_index(cls, request, dash_name, *args, **kwargs):
+        logger.debug('async_serve_dash_index')
+        view = await cls._async_dash_view(dash_name, cls._dash_index_base_url(request.path, kwargs))
+        with view._dash_bind(request, *args, **kwargs):   # pylint: disable=protected-access
+            return await sync_to_async(view.get)(request, *args, **kwargs)
+
+    @classmethod
+    async def async_serve_dash_dependencies(cls, request, dash_name, *args, **kwargs):
+        logger.debug('async_serve_dash_dependencies')
+        view = await cls._async_dash_view(dash_name, cls._dash_base_url(request.path, '/_dash-dependencies'))
+        with view._dash_bind(request, *args, **kwargs):   # pylint: disable=protected-access
+            # pylint: disable=protected-access
+            return await sync_to_async(view._dash_dependencies)(request, *args, **kwargs)
+
+    @classmethod
+    async def async_serve_dash_layout(cls, request, dash_name, *args, **kwargs):
+        logger.debug('async_serve_dash_layout')
+        view = await cls._async_dash_view(dash_name, cls._dash_base_url(request.path, '/_dash-layout'))
+        with view._dash_bind(request, *args, **kwargs):   # pylint: disable=protected-access
+            return await sync_to_async(view._dash_layout)(request, *args, **kwargs)  # pylint: disable=protected-access
+
+    @classmethod
+    @_async_csrf_exempt
+    async def async_serve_dash_upd_component(cls, request, dash_name, *args, **kwargs):
+        logger.debug('async_serve_dash_upd_component')
+        view = await cls._async_dash_view(dash_name, cls._dash_base_url(request.path, '/_dash-update-component'))
+        with view._dash_bind(request, *args, **kwargs):   # pylint: disable=protected-access
+            return await view._async_dash_upd_component(request, *args, **kwargs)   # pylint: disable=protected-access
+
+    @classmethod
+    async def async_serve_dash_component_suites(cls, request, dash_name, *args, **kwargs):
+        logger.debug('async_serve_dash_component_suites')
+        view = await cls._async_dash_view(dash_name, cls._dash_base_url(request.path, '/_dash-component-suites'))
+        # pylint: disable=protected-access
+        return await sync_to_async(view._dash_component_suites)(request, *args, **kwargs)
+
+    @classmethod
+    async def async_serve_dash_routes(cls, request, dash_name, *args, **kwargs):
+        logger.debug('async_serve_dash_routes')
+        view = await cls._async_dash_view(dash_name, cls._dash_base_url(request.path, '/_dash-routes'))
+        return view._dash_routes(request, *args, **kwargs)   # pylint: disable=protected-access
+
+    @classmethod
+    async def async_serve_reload_hash(cls, request, dash_name, *args, **kwargs):
+        logger.debug('async_serve_reload_hash')
+        view = await cls._async_dash_view(dash_name, cls._dash_base_url(request.path, '/_reload-hash'))
+        return view._dash_reload_hash(request, *args, **kwargs)   # pylint: disable=protected-access
+
+    @classmethod
+    async def async_serve_default_favicon(cls, request, dash_name, *args, **kwargs):
+        logger.debug('async_serve_default_favicon')
+        view = await cls._async_dash_view(dash_name, cls._dash_base_url(request.path, '/_favicon.ico'))
         return view._dash_default_favicon(request, *args, **kwargs)   # pylint: disable=protected-access
@@ -0,0 +1,56 @@
+import django
+from django.conf import settings
+
+import pytest
+
+
+def pytest_configure():
+    if not settings.configured:
+        settings.configure(
+            DEBUG=True,
+            INSTALLED_APPS=['django.contrib.staticfiles', 'dash'],
+            TEMPLATES=[{'BACKEND': 'django.template.backends.django.DjangoTemplates', 'APP_DIRS': True}],
+            STATIC_URL='/static/',
+            ROOT_URLCONF='dash.urls',
+        )
+        django.setup()
+
+
+@pytest.fixture
+def rf():
+    from django.test import RequestFactory
+
+    return RequestFactory()
+
+
+@pytest.fixture
+def register_view():
+    from dash import BaseDashView
+
+    names = []
+
+    def register(view_class, dash_name='test:view'):
+        BaseDashView._dashes[dash_name] = view_class
+        names.append(dash_name)
+        return dash_name
+
+    yield register
+
+    for name in names:
+        BaseDashView._dashes.pop(name, None)
+
+
+@pytest.fixture
+def settings_override():
+    from django.test import override_settings
+
+    overrides = []
+
+    def override(**kwargs):
+        overrides.append(override_settings(**kwargs))
+        overrides[-1].enable()
+
+    yield override
+
+    for overridden in reversed(overrides):
+        overridden.disable()
@@ -0,0 +1,240 @@
+import asyncio
+import json
+
+import pytest
+
+from dash import Dash, Memoize
+from dash._utils import to_json
+from dash.dependencies import Input, Output, State
+from dash.exceptions import FrozenCallbacksError
+
+
+def register(app):
+    @app.callback(Output("out", "children"), [Input("in", "value")], [State("st", "value")])
+    def update(value, st):
+        return value
+
+    app.clientside_callback(
+        "function(v) { return v; }", Output("cs", "children"), [Input("in", "value")]
+    )
+    return update
+
+
+def test_ddcb001_callbacks_are_keyed_by_output():
+    app = Dash()
+    register(app)
+    register(app)
+
+    assert len(app.dependencies()) == 2
+    assert len(app.callback_map) == 2
+    assert len(app._inline_scripts) == 1
+    assert app.dependencies()[1]["clientside_function"]["function_name"] == "children"
+
+
+def test_ddcb002_frozen_callbacks():
+    app = Dash()
+    update = register(app)
+    app.freeze_callbacks()
+    dependencies = app.dependencies()
+
+    assert app.callbacks_frozen
+    register(app)
+    assert app.dependencies() == dependencies
+    assert app.callback_map["out.children"]["callback"] is update
+
+    with pytest.raises(TypeError):
+        app.callback_map["out.children"]["callback"] = None
+
+    with pytest.raises(FrozenCallbacksError):
+        app.callback(Output("other", "children"), [Input("in", "value")])(lambda v: v)
+
+    _, response = app.update_component(
+        "out.children",
+        {"id": "out", "property": "children"},
+        [{"id": "in", "property": "value", "value": 1}],
+        [{"id": "st", "property": "value", "value": 2}],
+    )
+    assert response == {"response": {"out": {"children": 1}}, "multi": True}
+
+
+def test_ddcb003_async_callbacks():
+    app = Dash()
+
+    @app.callback(Output("async", "children"), [Input("in", "value")])
+    async def update_async(value):
+        await asyncio.sleep(0)
+        return "async {}".format(value)
+
+    @app.callback(Output("sync", "children"), [Input("in", "value")])
+    def update_sync(value):
+        return "sync {}".format(value)
+
+    inputs = [{"id": "in", "property": "value", "value": 1}]
+
+    _, response = app.update_component("async.children", {"id": "async", "property": "children"}, inputs, [])
+    assert response["response"] == {"async": {"children": "async 1"}}
+
+    _, response = asyncio.run(app.async_update_component(
+        "async.children", {"id": "async", "property": "children"}, inputs, []
+    ))
+    assert response["response"] == {"async": {"children": "async 1"}}
+
+    _, response = asyncio.run(app.async_update_component(
+        "sync.children", {"id": "sync", "property": "children"}, inputs, []
+    ))
+    assert response["response"] == {"sync": {"children": "sync 1"}}
+
+
+@pytest.mark.parametrize("cache_alias", [None, "memoize"])
+def test_ddcb004_memoized_callbacks(cache_alias, settings_override):
+    from dash.exceptions import PreventUpdate
+
+    settings_override(CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "memoize": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "memoize"},
+    })
+    app = Dash()
+    calls = []
+
+    @app.callback(Output("out", "children"), [Input("in", "value")], [State("st", "value")],
+                  memoize=Memoize(cache_alias=cache_alias))
+    def update(value, st):
+        calls.append((value, st))
+        if value is None:
+            raise PreventUpdate
+        return {"value": value, "state": st}
+
+    def call(value, st=2):
+        return app.update_component(
+            "out.children",
+            {"id": "out", "property": "children"},
+            [{"id": "in", "property": "value", "value": value}],
+            [{"id": "st", "property": "value", "value": st}],
+        )[1]
+
+    def content(response):
+        return json.loads(to_json(response))
+
+    expected = {"response": {"out": {"children": {"value": 1, "state": 2}}}, "multi": True}
+    assert content(call(1)) == expected
+    assert content(call(1)) == expected
+    assert content(asyncio.run(app.async_update_component(
+        "out.children",
+        {"id": "out", "property": "children"},
+        [{"id": "in", "property": "value", "value": 1}],
+        [{"id": "st", "property": "value", "value": 2}],
+    ))[1]) == expected
+    assert calls == [(1, 2)]
+    call(1, 3)
+    assert calls == [(1, 2), (1, 3)]
+
+    for _ in range(2):
+        with pytest.raises(PreventUpdate):
+            call(None)
+    assert calls == [(1, 2), (1, 3), (None, 2)]
+
+    app.invalidate_memoized("out.children")
+    assert content(call(1)) == expected
+    assert calls[-1] == (1, 2) and len(calls) == 4
+    app.invalidate_memoized()
+    call(1)
+    assert len(calls) == 5
+
+
+def test_ddcb005_memoized_callbacks_size():
+    from dash._memoize import _SizedMemoryCache
+
+    cache = _SizedMemoryCache(1000, {"timeout": None})
+    for i in range(10):
+        cache.set(i, b"x" * 300)
+        cache.get(0)
+    assert cache._bytes <= 1000
+    # The least recently used are dropped first
+    assert cache.get(0) is not None and cache.get(9) is not None and cache.get(1) is None
+    cache.set("big", b"x" * 2000)
+    assert cache.get("big") is None
+    cache.delete(0)
+    cache.clear()
+    assert cache._bytes == 0
+
+    app = Dash()
+    app.callback(Output("out", "children"), [Input("in", "value")], memoize=True)(lambda value: value)
+    assert isinstance(app.callback_map["out.children"]["memoize"], Memoize)
+
+
+def custom_dumps(obj):
+    return json.dumps(obj, sort_keys=True).encode("utf-8")
+
+
+def test_ddcb006_memoized_callbacks_custom_encoder(settings_override):
+    settings_override(DASH_JSON_ENCODER="tests.unit.dash.test_callbacks.custom_dumps")
+    app = Dash()
+    calls = []
+
+    @app.callback(Output("out", "children"), [Input("in", "value")], memoize=True)
+    def update(value):
+        calls.append(value)
+        return {"value": value}
+
+    args = ("out.children", {"id": "out", "property": "children"}, [{"id": "in", "property": "value", "value": 1}], [])
+    expected = {"response": {"out": {"children": {"value": 1}}}, "multi": True}
+    # The output values are cached as they are, for the encoder not knowing RawJSON
+    assert app.update_component(*args)[1] == expected
+    assert app.update_component(*args)[1] == expected
+    assert asyncio.run(app.async_update_component(*args))[1] == expected
+    assert to_json(app.update_component(*args)[1]) == custom_dumps(expected)
+    assert calls == [1]
+
+
+def test_ddcb007_memoized_callbacks_typed_arrays(settings_override, monkeypatch):
+    import numpy as np
+
+    from dash import _utils
+
+    settings_override(DASH_JSON_TYPED_ARRAYS=True)
+    monkeypatch.setattr(_utils, "served_plotlyjs_version", lambda: (2, 28))
+    _utils.get_json_encoder.cache_clear()
+    app = Dash()
+
+    @app.callback([Output("graph", "figure"), Output("table", "data")], [Input("in", "value")], memoize=True)
+    def update(value):
+        return {"data": [{"y": np.arange(3, dtype="f8")}]}, np.arange(2)
+
+    args = (
+        "..graph.figure...table.data..",
+        [{"id": "graph", "property": "figure"}, {"id": "table", "property": "data"}],
+        [{"id": "in", "property": "value", "value": 1}],
+        [],
+    )
+    for _ in range(2):
+        response = json.loads(to_json(app.update_component(*args)[1]))["response"]
+        assert response["graph"]["figure"]["data"][0]["y"]["dtype"] == "f8"
+        assert response["table"]["data"] == [0, 1]
+    _utils.get_json_encoder.cache_clear()
+
+
+def test_ddcb008_memoized_callbacks_of_app_copies():
+    app = Dash()
+    calls = []
+
+    def update(value):
+        calls.append(value)
+        return value
+
+    app.callback(Output("out", "children"), [Input("in", "value")], memoize=True)(update)
+    # As served by a view at another base URL, registering its callbacks again
+    copy = app.copy()
+    copy.config.url_base_pathname = "/other/"
+    copy.callback(Output("out", "children"), [Input("in", "value")], memoize=True)(update)
+    assert copy.callback_map["out.children"]["memoize"] is app.callback_map["out.children"]["memoize"]
+
+    args = ("out.children", {"id": "out", "property": "children"}, [{"id": "in", "property": "value", "value": 1}], [])
+    for _ in range(2):
+        app.update_component(*args)
+        copy.update_component(*args)
+    assert calls == [1]
+
+    app.invalidate_memoized("out.children")
+    copy.update_component(*args)
+    app.update_component(*args)
+    assert calls == [1, 1]
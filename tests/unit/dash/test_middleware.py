@@ -0,0 +1,77 @@
+import json
+
+from django.core.handlers.wsgi import WSGIRequest
+
+from dash._callback_context import set_request_attributes
+from dash.middleware import CommonMiddleware
+
+
+def test_ddmw001_lazy_callback_context(rf, mocker):
+    from_json = mocker.patch('dash._callback_context.from_json', wraps=json.loads)
+    inputs_to_dict = mocker.patch('dash._callback_context.inputs_to_dict', wraps=lambda inputs: {
+        '{}.{}'.format(i['id'], i['property']): i.get('value') for i in inputs
+    })
+    middleware = CommonMiddleware(lambda request: None)
+
+    request = rf.get('/dash/test:view/_dash-update-component')
+    middleware.process_request(request)
+    assert type(request) is WSGIRequest
+
+    body = {
+        'output': 'out.children',
+        'outputs': {'id': 'out', 'property': 'children'},
+        'inputs': [{'id': 'in', 'property': 'value', 'value': 1}],
+        'state': [{'id': 'table', 'property': 'data', 'value': [{'a': 1}] * 1000}],
+        'changedPropIds': ['in.value'],
+    }
+    request = rf.post('/dash/test:view/_dash-update-component', json.dumps(body), content_type='application/json')
+    middleware.process_request(request)
+    assert type(request) is WSGIRequest
+    assert from_json.call_count == 0
+
+    assert not hasattr(request, 'output')
+
+    # The update view sets the values, parsed once, before calling the callback
+    set_request_attributes(request)
+    assert request.output == 'out.children'
+    assert request.inputs_list == body['inputs']
+    assert len(request.states_list[0]['value']) == 1000
+    assert request.triggered_inputs == [{'prop_id': 'in.value', 'value': 1}]
+    assert type(request.input_values) is dict and type(request.triggered_inputs) is list
+    assert from_json.call_count == 1
+    assert inputs_to_dict.call_count == 2
+
+
+def test_ddmw002_callback_request_attributes(rf, register_view):
+    import dash_html_components as html
+
+    from dash import BaseDashView
+    from dash.dependencies import Input, Output
+
+    class DashView(BaseDashView):
+        def setup_callbacks(self):
+            self.dash.layout = html.Div([html.Div(id='in'), html.Div(id='out')])
+            self.dash.callback(Output('out', 'children'), [Input('in', 'value')])(self.update)
+
+        def update(self, value):
+            return {
+                'triggered': json.dumps(self.request.triggered_inputs),
+                'inputs': self.request.input_values,
+                'states': self.request.state_values,
+            }
+
+    name = register_view(DashView)
+    body = {
+        'output': 'out.children',
+        'outputs': {'id': 'out', 'property': 'children'},
+        'inputs': [{'id': 'in', 'property': 'value', 'value': 1}],
+        'changedPropIds': ['in.value'],
+    }
+    request = rf.post('/dash/test:view/_dash-update-component', json.dumps(body), content_type='application/json')
+    CommonMiddleware(lambda request: None).process_request(request)
+    response = BaseDashView.serve_dash_upd_component(request, name)
+    assert json.loads(response.content)['response']['out']['children'] == {
+        'triggered': '[{"prop_id": "in.value", "value": 1}]',
+        'inputs': {'in.value': 1},
+        'states': {},
+    }
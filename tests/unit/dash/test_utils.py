@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 import dash._utils as utils
@@ -59,3 +61,156 @@ def test_ddut001_attribute_dict():
         a.x = 4
     assert err.value.args == ("Object is final: No new keys may be added.", "x")
     assert "x" not in a
+
+
+@pytest.mark.parametrize("name", ["json", "orjson"])
+def test_ddut002_json_encoders(name, settings_override):
+    import datetime
+
+    import numpy as np
+    import dash_html_components as html
+
+    pytest.importorskip(name)
+    settings_override(DASH_JSON_ENCODER=name)
+
+    value = {
+        "layout": html.Div([html.Span("a", id="span")], id="root"),
+        "array": np.arange(3),
+        "floats": np.array([0.5, np.nan]),
+        "date": datetime.date(2020, 1, 2),
+        "int": np.int64(7),
+    }
+    assert json.loads(utils.to_json(value)) == {
+        "layout": {
+            "props": {
+                "children": [{"props": {"children": "a", "id": "span"}, "type": "Span",
+                              "namespace": "dash_html_components"}],
+                "id": "root",
+            },
+            "type": "Div",
+            "namespace": "dash_html_components",
+        },
+        "array": [0, 1, 2],
+        "floats": [0.5, None],
+        "date": "2020-01-02",
+        "int": 7,
+    }
+
+
+def test_ddut003_json_encoder_setting(settings_override):
+    from django.core.exceptions import ImproperlyConfigured
+
+    settings_override(DASH_JSON_ENCODER="dash._utils._json_dumps")
+    assert utils.to_json([1]) == b"[1]"
+
+    settings_override(DASH_JSON_ENCODER="nope")
+    with pytest.raises(ImproperlyConfigured):
+        utils.to_json([1])
+
+
+@pytest.mark.parametrize("name", ["json", "orjson", "auto"])
+def test_ddut004_json_decoders(name, settings_override):
+    if name == "orjson":
+        pytest.importorskip(name)
+    settings_override(DASH_JSON_DECODER=name)
+
+    assert utils.from_json(b'{"inputs": [{"id": "in", "value": 1.5}]}') == {"inputs": [{"id": "in", "value": 1.5}]}
+
+
+@pytest.mark.parametrize("name", ["json", "orjson"])
+def test_ddut005_json_typed_arrays(name, settings_override, monkeypatch):
+    import base64
+
+    import numpy as np
+    import plotly.graph_objects as go
+    import dash_core_components as dcc
+
+    from django.core.exceptions import ImproperlyConfigured
+
+    pytest.importorskip(name)
+    settings_override(DASH_JSON_ENCODER=name, DASH_JSON_TYPED_ARRAYS=True)
+
+    # The plotly.js of dash_core_components must decode them
+    utils.get_json_encoder.cache_clear()
+    monkeypatch.setattr(utils, "served_plotlyjs_version", lambda: (1, 57))
+    with pytest.raises(ImproperlyConfigured):
+        utils.to_json([])
+    utils.get_json_encoder.cache_clear()
+    monkeypatch.setattr(utils, "served_plotlyjs_version", lambda: (2, 28))
+
+    grid = np.arange(6, dtype=">f4").reshape(2, 3)
+    trace = {
+        "x": np.arange(3),
+        "y": np.array([0.5, np.nan]),
+        "z": grid,
+        "marker": {"size": np.arange(3)},
+        "big": np.array([2 ** 40]),
+        "dates": np.array(["2020-01-01"], dtype="datetime64[D]"),
+    }
+    value = json.loads(utils.to_json({"response": {"graph": {"figure": {"data": [trace]}, "data": np.arange(2)}}}))
+    encoded = value["response"]["graph"]["figure"]["data"][0]
+
+    assert encoded["x"] == {"dtype": "i4", "bdata": base64.b64encode(np.arange(3, dtype="<i4").tobytes()).decode()}
+    assert encoded["y"]["dtype"] == "f8"
+    y = np.frombuffer(base64.b64decode(encoded["y"]["bdata"]), "<f8")
+    assert y[0] == 0.5 and np.isnan(y[1])
+    assert encoded["z"]["shape"] == "2, 3"
+    assert np.array_equal(np.frombuffer(base64.b64decode(encoded["z"]["bdata"]), "<f4").reshape(2, 3), grid)
+    assert encoded["marker"]["size"]["dtype"] == "i4"
+    assert encoded["big"] == [2 ** 40]
+    assert encoded["dates"][0].startswith("2020-01-01")
+    # Only the arrays of the figures
+    assert value["response"]["graph"]["data"] == [0, 1]
+    assert isinstance(trace["x"], np.ndarray)
+
+    graphs = [
+        dcc.Graph(id="dict", figure={"data": [{"y": np.arange(3)}]}),
+        dcc.Graph(id="figure", figure=go.Figure(go.Scatter(y=np.arange(3)))),
+    ]
+    for graph in json.loads(utils.to_json(graphs)):
+        assert "bdata" in graph["props"]["figure"]["data"][0]["y"]
+    assert json.loads(utils.to_json({"table": np.arange(2)})) == {"table": [0, 1]}
+
+    # Streamed, the figures are found as they are walked
+    response = {"response": {"graph": {"figure": {"data": [trace]}, "data": np.arange(2)}}}
+    assert json.loads(b"".join(utils.iter_json(response, chunk_size=16))) == value
+    streamed = json.loads(b"".join(utils.iter_json([graphs, go.Figure(go.Scatter(y=np.arange(3)))])))
+    for graph in streamed[0]:
+        assert "bdata" in graph["props"]["figure"]["data"][0]["y"]
+    assert "bdata" in streamed[1]["data"][0]["y"]
+    utils.get_json_encoder.cache_clear()
+
+
+def test_ddut006_iter_json():
+    import numpy as np
+    import dash_html_components as html
+
+    value = {
+        "layout": html.Div([html.Span(str(i), id={"index": i}) for i in range(100)], id="root"),
+        "values": [1, 2.5, float("nan"), None, True, "é", (1, 2)],
+        "array": np.arange(3),
+        1: "key",
+    }
+    chunks = list(utils.iter_json(value, chunk_size=256))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) >= 256 for chunk in chunks[:-1])
+    assert json.loads(b"".join(chunks)) == json.loads(utils.to_json(value))
+    assert b"".join(utils.iter_json([])) == b"[]"
+
+
+@pytest.mark.parametrize("name", ["json", "orjson", "dash._utils._json_dumps"])
+def test_ddut007_raw_json(name, settings_override):
+    import dash_core_components as dcc
+
+    pytest.importorskip(name.split(".")[0])
+    settings_override(DASH_JSON_ENCODER=name)
+
+    figure = b'{"data":[{"y":[1,2,3]}],"layout":{"title":"\\u00e9"}}'
+    value = {"graph": dcc.Graph(id="graph", figure=utils.RawJSON(figure)), "raw": utils.RawJSON("[1]")}
+
+    for content in (utils.to_json(value), b"".join(utils.iter_json(value))):
+        assert figure in content
+        decoded = json.loads(content)
+        assert decoded["graph"]["props"]["figure"] == json.loads(figure)
+        assert decoded["raw"] == [1]
@@ -0,0 +1,658 @@
+import asyncio
+import gzip
+import json
+import os
+import threading
+
+import pytest
+
+import dash_html_components as html
+
+from dash import Dash, BaseDashView
+from dash.dependencies import Input, Output
+
+
+def upd_component_body(value):
+    return json.dumps({
+        'output': 'out.children',
+        'outputs': {'id': 'out', 'property': 'children'},
+        'inputs': [{'id': 'in', 'property': 'value', 'value': value}],
+        'changedPropIds': ['in.value'],
+    })
+
+
+def test_ddvw001_view_is_compiled_once(rf, register_view):
+    built = []
+
+    class DashView(BaseDashView):
+        def setup_callbacks(self):
+            built.append(self)
+            self.dash.layout = html.Div([html.Div(id='in'), html.Div(id='out')])
+
+    name = register_view(DashView)
+
+    for _ in range(3):
+        response = BaseDashView.serve_dash_layout(rf.get('/dash/test:view/_dash-layout'), name)
+        assert json.loads(response.content)['type'] == 'Div'
+    BaseDashView.serve_dash_dependencies(rf.get('/dash/test:view/_dash-dependencies'), name)
+
+    assert len(built) == 1
+
+    BaseDashView.serve_dash_layout(rf.get('/other/test:view/_dash-layout'), name)
+    assert len(built) == 2, 'views are compiled per base url'
+
+
+def test_ddvw002_view_cache_opt_out(rf, register_view):
+    built = []
+
+    class DashView(BaseDashView):
+        dash_view_cache = False
+
+        def setup_callbacks(self):
+            built.append(self)
+
+        def dash_layout(self):
+            return html.Div(id='layout')
+
+    name = register_view(DashView)
+
+    for _ in range(2):
+        BaseDashView.serve_dash_layout(rf.get('/dash/test:view/_dash-layout'), name)
+
+    assert len(built) == 2
+
+
+def test_ddvw003_request_is_bound_per_thread(rf, register_view):
+    barrier = threading.Barrier(2, timeout=5)
+
+    class DashView(BaseDashView):
+        def setup_callbacks(self):
+            self.dash.callback(Output('out', 'children'), [Input('in', 'value')])(self.update)
+
+        def update(self, value):
+            barrier.wait()
+            return '{}:{}'.format(value, self.request.GET['who'])
+
+    name = register_view(DashView)
+
+    results = {}
+
+    def call(who):
+        request = rf.post(
+            '/dash/test:view/_dash-update-component?who={}'.format(who),
+            upd_component_body(who), content_type='application/json'
+        )
+        request.output = 'out.children'
+        request.outputs_list = {'id': 'out', 'property': 'children'}
+        request.inputs_list = [{'id': 'in', 'property': 'value', 'value': who}]
+        request.states_list = []
+        response = BaseDashView.serve_dash_upd_component(request, name)
+        results[who] = json.loads(response.content)['response']['out']['children']
+
+    threads = [threading.Thread(target=call, args=(who,)) for who in ('a', 'b')]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == {'a': 'a:a', 'b': 'b:b'}
+
+    view = BaseDashView._dash_view(name, '/dash/test:view/')
+    assert not hasattr(view, 'request'), 'request is unbound after the response'
+
+
+def test_ddvw004_index_sub_path_shares_view(rf, register_view):
+    class DashView(BaseDashView):
+        dash = Dash()
+        dash.layout = html.Div()
+
+    name = register_view(DashView)
+
+    BaseDashView.serve_dash_index(rf.get('/dash/test:view/'), name)
+    BaseDashView.serve_dash_index(rf.get('/dash/test:view/page-1/'), name, path='page-1')
+
+    assert [k[1] for k in BaseDashView._dash_views if k[0] is DashView] == ['/dash/test:view/']
+
+
+def test_ddvw005_shared_app_registers_callbacks_once(rf, register_view):
+    app = Dash()
+    app.layout = html.Div([html.Div(id='in'), html.Div(id='out')])
+    calls = []
+
+    class DashView(BaseDashView):
+        dash = app
+        dash_view_cache = False
+
+        def setup_callbacks(self):
+            calls.append(self)
+            self.dash.callback(Output('out', 'children'), [Input('in', 'value')])(self.update)
+
+        def update(self, value):
+            return self.request.path
+
+    name = register_view(DashView)
+
+    for _ in range(3):
+        response = BaseDashView.serve_dash_dependencies(rf.get('/dash/test:view/_dash-dependencies'), name)
+        assert len(json.loads(response.content)) == 1
+
+    assert len(calls) == 1
+    assert app.callbacks_frozen
+
+
+def test_ddvw006_async_update_component(rf, register_view):
+    class DashView(BaseDashView):
+        def setup_callbacks(self):
+            self.dash.callback(Output('out', 'children'), [Input('in', 'value')])(self.update)
+
+        async def update(self, value):
+            await asyncio.sleep(0)
+            return '{}:{}'.format(value, self.request.GET['who'])
+
+    name = register_view(DashView)
+
+    async def call(who):
+        request = rf.post(
+            '/dash/test:view/_dash-update-component?who={}'.format(who),
+            upd_component_body(who), content_type='application/json'
+        )
+        request.output = 'out.children'
+        request.outputs_list = {'id': 'out', 'property': 'children'}
+        request.inputs_list = [{'id': 'in', 'property': 'value', 'value': who}]
+        request.states_list = []
+        response = await BaseDashView.async_serve_dash_upd_component(request, name)
+        return json.loads(response.content)['response']['out']['children']
+
+    async def main():
+        return await asyncio.gather(call('a'), call('b'))
+
+    assert asyncio.run(main()) == ['a:a', 'b:b']
+    assert BaseDashView.async_serve_dash_upd_component.csrf_exempt
+
+
+def test_ddvw007_index_etag(rf, register_view):
+    class DashView(BaseDashView):
+        dash = Dash()
+        dash.layout = html.Div()
+
+    name = register_view(DashView)
+
+    response = BaseDashView.serve_dash_index(rf.get('/dash/test:view/'), name)
+    response.render()
+    etag = response['ETag']
+    assert response.status_code == 200
+    assert b'_dash-config' in response.content
+
+    response = BaseDashView.serve_dash_index(rf.get('/dash/test:view/', HTTP_IF_NONE_MATCH=etag), name)
+    assert response.status_code == 304
+
+    DashView.dash.config.update_title = 'Loading...'
+    response = BaseDashView.serve_dash_index(rf.get('/dash/test:view/', HTTP_IF_NONE_MATCH=etag), name)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+
+
+def test_ddvw008_dependencies_etag(rf, register_view):
+    class DashView(BaseDashView):
+        def setup_callbacks(self):
+            self.dash.callback(Output('out', 'children'), [Input('in', 'value')])(lambda value: value)
+
+    name = register_view(DashView)
+
+    response = BaseDashView.serve_dash_dependencies(rf.get('/dash/test:view/_dash-dependencies'), name)
+    etag = response['ETag']
+    assert response.status_code == 200
+    assert json.loads(response.content)[0]['output'] == 'out.children'
+
+    response = BaseDashView.serve_dash_dependencies(
+        rf.get('/dash/test:view/_dash-dependencies', HTTP_IF_NONE_MATCH=etag), name
+    )
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+
+
+def test_ddvw009_static_layout_is_encoded_once(rf, register_view, mocker):
+    class DashView(BaseDashView):
+        dash = Dash()
+        dash.layout = html.Div([html.Div('item {}'.format(i)) for i in range(100)], id='root')
+
+    name = register_view(DashView)
+    to_plotly_json = mocker.spy(html.Div, 'to_plotly_json')
+
+    response = BaseDashView.serve_dash_layout(rf.get('/dash/test:view/_dash-layout'), name)
+    etag = response['ETag']
+    assert json.loads(response.content)['props']['id'] == 'root'
+    calls = to_plotly_json.call_count
+
+    response = BaseDashView.serve_dash_layout(
+        rf.get('/dash/test:view/_dash-layout', HTTP_IF_NONE_MATCH=etag), name
+    )
+    assert response.status_code == 304
+
+    response = BaseDashView.serve_dash_layout(
+        rf.get('/dash/test:view/_dash-layout', HTTP_ACCEPT_ENCODING='gzip, br'), name
+    )
+    assert response['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(response.content))['props']['id'] == 'root'
+    assert to_plotly_json.call_count == calls
+
+    DashView.dash.layout = html.Div(id='new')
+    response = BaseDashView.serve_dash_layout(rf.get('/dash/test:view/_dash-layout'), name)
+    assert json.loads(response.content)['props']['id'] == 'new'
+    assert response['ETag'] != etag
+
+
+def test_ddvw010_layout_cache_key(rf, register_view):
+    calls = []
+
+    def layout():
+        calls.append(1)
+        return html.Div(id='layout-{}'.format(len(calls)))
+
+    class DashView(BaseDashView):
+        dash = Dash()
+        dash.layout = layout
+
+        def dash_layout_cache_key(self, request):
+            return request.GET.get('tenant')
+
+    name = register_view(DashView)
+
+    def get(tenant=None):
+        url = '/dash/test:view/_dash-layout' + ('?tenant={}'.format(tenant) if tenant else '')
+        return json.loads(BaseDashView.serve_dash_layout(rf.get(url), name).content)['props']['id']
+
+    assert get('a') == 'layout-1'
+    assert get('a') == 'layout-1'
+    assert get('b') == 'layout-2'
+    assert get() == 'layout-3'
+    assert get() == 'layout-4', 'requests without a key are not cached'
+
+
+def test_ddvw023_gzipped_cached_layouts(rf, register_view, mocker):
+    class DashView(BaseDashView):
+        dash = Dash()
+        dash.layout = lambda: html.Div([html.Div('text {}'.format(i)) for i in range(100)], id='root')
+
+        def dash_layout_cache_key(self, request):
+            return 'key'
+
+    name = register_view(DashView)
+    compress = mocker.spy(gzip, 'compress')
+    for _ in range(3):
+        response = BaseDashView.serve_dash_layout(
+            rf.get('/dash/test:view/_dash-layout', HTTP_ACCEPT_ENCODING='gzip'), name
+        )
+        assert json.loads(gzip.decompress(response.content))['props']['id'] == 'root'
+    # Gzipped once by the ETag of the layout, the contents of the cache being new bytes objects
+    assert compress.call_count == 1
+
+
+def test_ddvw011_component_suites(rf, register_view):
+    class DashView(BaseDashView):
+        dash_components = {html.__name__}
+
+    name = register_view(DashView)
+    base = '/dash/test:view/_dash-component-suites/dash_html_components/'
+
+    def get(path, **headers):
+        return BaseDashView.serve_dash_component_suites(
+            rf.get(base + path, **headers), name,
+            package_name='dash_html_components', fingerprinted_path=path
+        )
+
+    with open(os.path.join(os.path.dirname(html.__file__), 'dash_html_components.min.js'), 'rb') as f:
+        bundle = f.read()
+
+    response = get('dash_html_components.v1_1_1m1234.min.js')
+    assert response.status_code == 200
+    assert b''.join(response.streaming_content) == bundle
+    assert 'immutable' in response['Cache-Control']
+    etag = response['ETag']
+
+    response = get('dash_html_components.min.js', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert 'Cache-Control' not in response
+
+    response = get('dash_html_components.min.js', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+    assert response.status_code == 304
+
+    response = get('dash_html_components.min.js', HTTP_RANGE='bytes=10-19')
+    assert response.status_code == 206
+    assert response.content == bundle[10:20]
+    assert response['Content-Range'] == 'bytes 10-19/{}'.format(len(bundle))
+
+    response = get('dash_html_components.min.js', HTTP_RANGE='bytes=-5')
+    assert response.content == bundle[-5:]
+
+    response = get('dash_html_components.min.js', HTTP_RANGE='bytes={}-'.format(len(bundle)))
+    assert response.status_code == 416
+
+
+def test_ddvw012_precompressed_component_suites(rf, register_view, tmp_path, monkeypatch, mocker):
+    from django.core.management import call_command
+    from dash.development.base_component import ComponentRegistry
+    from dash.staticfiles.compress import brotli
+
+    package = tmp_path / 'dash_precompressed'
+    package.mkdir()
+    (package / '__init__.py').write_text(
+        "__version__ = '1.0.0'\n"
+        "_js_dist = [{'relative_package_path': 'bundle.js', 'namespace': 'dash_precompressed'}]\n"
+    )
+    bundle = b'window.bundle = "' + b'dash' * 1000 + b'";'
+    (package / 'bundle.js').write_bytes(bundle)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    mocker.patch.object(ComponentRegistry, 'registry', ComponentRegistry.registry | {'dash_precompressed'})
+    mocker.patch.dict(ComponentRegistry._ComponentRegistry__dist_cache, clear=True)
+
+    call_command('compress_dash_suites', 'dash_precompressed')
+    assert gzip.decompress((package / 'bundle.js.gz').read_bytes()) == bundle
+    assert (package / 'bundle.js.br').exists() == (brotli is not None)
+
+    class DashView(BaseDashView):
+        dash_components = {'dash_precompressed'}
+
+    name = register_view(DashView)
+
+    def get(**headers):
+        return BaseDashView.serve_dash_component_suites(
+            rf.get('/dash/test:view/_dash-component-suites/dash_precompressed/bundle.js', **headers), name,
+            package_name='dash_precompressed', fingerprinted_path='bundle.js'
+        )
+
+    response = get(HTTP_ACCEPT_ENCODING='gzip, deflate, br;q=0')
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['Content-Type'] == 'application/javascript'
+    assert response['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(b''.join(response.streaming_content)) == bundle
+
+    response = get(HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == 304
+
+    response = get(HTTP_ACCEPT_ENCODING='identity')
+    assert 'Content-Encoding' not in response
+    assert b''.join(response.streaming_content) == bundle
+
+    response = get(HTTP_ACCEPT_ENCODING='gzip', HTTP_RANGE='bytes=0-5')
+    assert 'Content-Encoding' not in response
+    assert response.content == bundle[:6]
+
+    if brotli is not None:
+        response = get(HTTP_ACCEPT_ENCODING='gzip, br')
+        assert response['Content-Encoding'] == 'br'
+        assert brotli.decompress(b''.join(response.streaming_content)) == bundle
+
+
+def test_ddvw013_compressed_update_component(rf, register_view):
+    class DashView(BaseDashView):
+        dash_compress_min_size = 1000
+        dash_compress_level = 9
+
+        def setup_callbacks(self):
+            self.dash.callback(Output('out', 'children'), [Input('in', 'value')])(self.update)
+
+        def update(self, value):
+            self.response.set_cookie('size', value)
+            return 'x' * int(value)
+
+    name = register_view(DashView)
+
+    def call(value, **headers):
+        request = rf.post('/dash/test:view/_dash-update-component', upd_component_body(value),
+                          content_type='application/json', **headers)
+        request.output = 'out.children'
+        request.outputs_list = {'id': 'out', 'property': 'children'}
+        request.inputs_list = [{'id': 'in', 'property': 'value', 'value': value}]
+        request.states_list = []
+        return BaseDashView.serve_dash_upd_component(request, name)
+
+    response = call('10', HTTP_ACCEPT_ENCODING='gzip')
+    assert 'Content-Encoding' not in response
+    assert response['Vary'] == 'Accept-Encoding'
+
+    response = call('5000')
+    assert 'Content-Encoding' not in response
+
+    response = call('5000', HTTP_ACCEPT_ENCODING='gzip, deflate')
+    assert response['Content-Encoding'] == 'gzip'
+    assert int(response['Content-Length']) == len(response.content) < 5000
+    assert json.loads(gzip.decompress(response.content))['response']['out']['children'] == 'x' * 5000
+    assert response.cookies['size'].value == '5000'
+
+    DashView.dash_compress_streaming_size = 100 * 1024
+    response = call('500000', HTTP_ACCEPT_ENCODING='gzip')
+    assert response.streaming
+    assert response['Content-Encoding'] == 'gzip'
+    assert response.cookies['size'].value == '500000'
+    content = gzip.decompress(b''.join(response.streaming_content))
+    assert json.loads(content)['response']['out']['children'] == 'x' * 500000
+
+
+def test_ddvw014_compressed_dependencies(rf, register_view):
+    class DashView(BaseDashView):
+        dash_compress_min_size = 10
+
+        def setup_callbacks(self):
+            self.dash.callback(Output('out', 'children'), [Input('in', 'value')])(lambda value: value)
+
+    name = register_view(DashView)
+
+    response = BaseDashView.serve_dash_dependencies(
+        rf.get('/dash/test:view/_dash-dependencies', HTTP_ACCEPT_ENCODING='gzip'), name
+    )
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['ETag'].endswith('-gzip"')
+    assert json.loads(gzip.decompress(response.content))[0]['output'] == 'out.children'
+
+    name = register_view(type('DashView', (DashView,), {'dash_compress': False}), 'test:plain')
+    response = BaseDashView.serve_dash_dependencies(
+        rf.get('/dash/test:plain/_dash-dependencies', HTTP_ACCEPT_ENCODING='gzip'), name
+    )
+    assert 'Content-Encoding' not in response
+
+
+def test_ddvw015_stream_json(rf, register_view):
+    class DashView(BaseDashView):
+        dash_stream_json = True
+
+        def dash_layout(self):
+            return html.Div([html.Div('item {}'.format(i)) for i in range(20000)], id='root')
+
+        def setup_callbacks(self):
+            self.dash.callback(Output('out', 'children'), [Input('in', 'value')])(self.update)
+
+        def update(self, value):
+            self.response.set_cookie('seen', '1')
+            return [html.Span(str(i)) for i in range(int(value))]
+
+    name = register_view(DashView)
+
+    response = BaseDashView.serve_dash_layout(rf.get('/dash/test:view/_dash-layout'), name)
+    assert response.streaming
+    chunks = list(response.streaming_content)
+    assert len(chunks) > 1
+    layout = json.loads(b''.join(chunks))
+    assert layout['props']['id'] == 'root'
+    assert len(layout['props']['children']) == 20000
+
+    request = rf.post('/dash/test:view/_dash-update-component', upd_component_body('5000'),
+                      content_type='application/json', HTTP_ACCEPT_ENCODING='gzip')
+    response = BaseDashView.serve_dash_upd_component(request, name)
+    assert response.streaming
+    assert response['Content-Encoding'] == 'gzip'
+    assert response.cookies['seen'].value == '1'
+    children = json.loads(gzip.decompress(b''.join(response.streaming_content)))['response']['out']['children']
+    assert children[-1] == {'props': {'children': '4999'}, 'type': 'Span', 'namespace': 'dash_html_components'}
+
+
+def test_ddvw016_raw_json_output(rf, register_view):
+    from dash import RawJSON
+
+    figure = b'{"data": [{"y": [1, 2, 3]}]}'
+
+    class DashView(BaseDashView):
+        def setup_callbacks(self):
+            self.dash.callback(Output('out', 'children'), [Input('in', 'value')])(lambda value: RawJSON(figure))
+
+    name = register_view(DashView)
+
+    request = rf.post('/dash/test:view/_dash-update-component', upd_component_body('1'),
+                      content_type='application/json')
+    response = BaseDashView.serve_dash_upd_component(request, name)
+    assert figure in response.content
+    assert json.loads(response.content)['response']['out']['children'] == json.loads(figure)
+
+
+def test_ddvw017_props_check(rf, register_view, settings_override):
+    settings_override(DASH_PROPS_CHECK=False)
+
+    class DashView(BaseDashView):
+        def dash_layout(self):
+            return html.Div(id='root', unknown='value')
+
+    class CheckedView(DashView):
+        dash_props_check = True
+
+    name = register_view(DashView)
+    response = BaseDashView.serve_dash_layout(rf.get('/dash/test:view/_dash-layout'), name)
+    assert json.loads(response.content)['props'] == {'children': None, 'id': 'root'}
+
+    name = register_view(CheckedView)
+    with pytest.raises(TypeError):
+        BaseDashView.serve_dash_layout(rf.get('/dash/test:view/_dash-layout'), name)
+    assert BaseDashView._dash_view(name, '/dash/').dash._dev_tools.props_check is True
+
+
+def test_ddvw019_shared_app_base_urls(rf, register_view):
+    app = Dash()
+    app.layout = html.Div([html.Div(id='in'), html.Div(id='out')])
+
+    class DashView(BaseDashView):
+        dash = app
+
+        def setup_callbacks(self):
+            self.dash.callback(Output('out', 'children'), [Input('in', 'value')])(lambda value: value)
+
+    name = register_view(DashView)
+
+    for _ in range(2):
+        for base_url in ('/dash/test:view/', '/other/test:view/'):
+            response = BaseDashView.serve_dash_index(rf.get(base_url), name).render()
+            assert '"url_base_pathname": "{}"'.format(base_url) in response.content.decode('utf-8')
+            response = BaseDashView.serve_dash_dependencies(rf.get(base_url + '_dash-dependencies'), name)
+            assert len(json.loads(response.content)) == 1
+
+    assert BaseDashView._dash_view(name, '/dash/test:view/').dash is app
+    copy = BaseDashView._dash_view(name, '/other/test:view/').dash
+    assert copy is not app and copy.callbacks_frozen
+    assert app.config.url_base_pathname == '/dash/test:view/'
+
+
+def test_ddvw020_compiled_views_are_bounded(rf, register_view, monkeypatch):
+    class DashView(BaseDashView):
+        def dash_layout(self):
+            return html.Div()
+
+    name = register_view(DashView)
+    monkeypatch.setattr(BaseDashView, '_dash_views_max_size', 3)
+
+    for org in range(5):
+        BaseDashView.serve_dash_layout(rf.get('/{}/test:view/_dash-layout'.format(org)), name)
+        BaseDashView._dash_view(name, '/0/test:view/')
+    assert [k[1] for k in BaseDashView._dash_views if k[0] is DashView] == [
+        '/3/test:view/', '/4/test:view/', '/0/test:view/'
+    ]
+
+
+@pytest.mark.parametrize('view_cache', [True, False])
+def test_ddvw021_views_sharing_an_app(rf, register_view, view_cache):
+    from dash.exceptions import FrozenCallbacksError
+
+    app = Dash()
+    app.layout = html.Div([html.Div(id='in'), html.Div(id='a'), html.Div(id='b')])
+
+    def make_view(prop):
+        class DashView(BaseDashView):
+            dash = app
+            dash_view_cache = view_cache
+
+            def setup_callbacks(self):
+                self.dash.callback(Output(prop, 'children'), [Input('in', 'value')])(lambda value: prop)
+
+        return DashView
+
+    names = {prop: register_view(make_view(prop), 'test:' + prop) for prop in 'ab'}
+    for _ in range(2):
+        for prop, name in names.items():
+            base_url = '/dash/{}/'.format(name)
+            response = BaseDashView.serve_dash_dependencies(rf.get(base_url + '_dash-dependencies'), name)
+            assert prop + '.children' in [c['output'] for c in json.loads(response.content)]
+
+            body = json.loads(upd_component_body('1'))
+            body.update(output=prop + '.children', outputs={'id': prop, 'property': 'children'})
+            request = rf.post(base_url + '_dash-update-component', json.dumps(body),
+                              content_type='application/json')
+            response = BaseDashView.serve_dash_upd_component(request, name)
+            assert json.loads(response.content)['response'] == {prop: {'children': prop}}
+
+    # A view class registering its callbacks into an app frozen by another one of the same base url
+    class LateView(make_view('late')):
+        dash = app
+        dash_base_url = app.config.url_base_pathname
+
+    with pytest.raises(FrozenCallbacksError):
+        LateView()
+
+
+def test_ddvw022_index_etag_with_context(rf, register_view):
+    class DashView(BaseDashView):
+        dash = Dash()
+        dash.layout = html.Div()
+
+        def get_context_data(self, **kwargs):
+            context = super().get_context_data(**kwargs)
+            context['user_name'] = self.request.GET.get('user')
+            return context
+
+    class EtagView(DashView):
+        dash_index_etag = True
+
+    assert DashView.dash_index_etag is False
+
+    name = register_view(DashView)
+    response = BaseDashView.serve_dash_index(rf.get('/dash/test:view/'), name)
+    assert response.status_code == 200 and not response.has_header('ETag')
+
+    name = register_view(EtagView)
+    response = BaseDashView.serve_dash_index(rf.get('/dash/test:view/'), name)
+    assert response.has_header('ETag')
+
+
+def test_ddvw024_index_etag_follows_template(rf, register_view, settings_override):
+    templates = {'dash/custom.html': '{{ dash_config }} v1'}
+
+    def use_templates():
+        settings_override(TEMPLATES=[{
+            'BACKEND': 'django.template.backends.django.DjangoTemplates',
+            'OPTIONS': {'loaders': [('django.template.loaders.locmem.Loader', dict(templates))]},
+        }])
+
+    class DashView(BaseDashView):
+        dash = Dash()
+        dash.layout = html.Div()
+        template_name = 'dash/custom.html'
+
+    name = register_view(DashView)
+
+    use_templates()
+    etag = BaseDashView.serve_dash_index(rf.get('/dash/test:view/'), name)['ETag']
+    response = BaseDashView.serve_dash_index(rf.get('/dash/test:view/', HTTP_IF_NONE_MATCH=etag), name)
+    assert response.status_code == 304
+
+    # A new template, as deployed and loaded by a new process
+    templates['dash/custom.html'] = '{{ dash_config }} v2'
+    use_templates()
+    response = BaseDashView.serve_dash_index(rf.get('/dash/test:view/', HTTP_IF_NONE_MATCH=etag), name)
+    assert response.status_code == 200 and response['ETag'] != etag
+    assert response.render().content.endswith(b'v2')
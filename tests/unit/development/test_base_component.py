@@ -4,7 +4,7 @@ import plotly
 import pytest
 
 import dash_html_components as html
-from dash.development.base_component import Component
+from dash.development.base_component import Component, clone_with, freeze, template
 
 Component._prop_names = ("id", "a", "children", "style")
 Component._type = "TestComponent"
@@ -474,3 +474,231 @@ def test_debc027_component_error_message():
         + "keyword argument: `asdf`\n"
         + "Allowed arguments: {}".format(", ".join(sorted(html.Div()._prop_names)))
     )
+
+
+def test_debc028_to_plotly_json_tree():
+    c = nested_tree()[0]
+
+    tree = c._to_plotly_json_tree()
+    assert json.loads(json.dumps(tree)) == json.loads(
+        json.dumps(c.to_plotly_json(), cls=plotly.utils.PlotlyJSONEncoder)
+    )
+    # The components are not changed
+    assert isinstance(c.children[1], Component)
+    assert isinstance(tree["props"]["children"][1]["props"]["children"], dict)
+
+
+def test_debc029_to_plotly_json_compiled_props():
+    class PropComponent(Component):
+        @property
+        def a(self):
+            return "property"
+
+    c = PropComponent(id="a", **{"data-x": 1})
+    assert c.to_plotly_json()["props"] == {"id": "a", "a": "property", "data-x": 1}
+
+    # The props are compiled again if they are changed
+    c._prop_names = ("id",)
+    c._valid_wildcard_attributes = []
+    assert c.to_plotly_json()["props"] == {"id": "a"}
+    assert PropComponent(id="b").to_plotly_json()["props"] == {"id": "b", "a": "property"}
+
+
+def test_debc030_freeze(mocker):
+    from dash._utils import iter_json, to_json
+
+    c, c1, c2, c3, c4, c5 = nested_tree()
+    expected = json.loads(json.dumps(c, cls=plotly.utils.PlotlyJSONEncoder))
+
+    assert freeze(c4) is c4
+    assert isinstance(c4, Component) and isinstance(c1, Component)
+    assert isinstance(c2.children, tuple)
+    with pytest.raises(AttributeError):
+        c1.children = "changed"
+    with pytest.raises(AttributeError):
+        del c3.id
+    with pytest.raises(TypeError):
+        c4["0.1.x.x.0"] = Component(id="new")
+    # The rest of the tree is not frozen
+    c5.children = "changed"
+    expected["props"]["children"][0]["props"]["children"] = "changed"
+
+    # The JSON of the frozen subtree is encoded once
+    spy = mocker.spy(Component, "_to_plotly_json_tree")
+
+    def frozen_encodings():
+        return [call for call in spy.call_args_list if call[1] == {"keep_frozen": False}]
+
+    assert json.loads(to_json(c)) == expected
+    assert json.loads(to_json({"layout": c})) == {"layout": expected}
+    assert json.loads(b"".join(iter_json(c, chunk_size=16))) == expected
+    assert [call[0][0] for call in frozen_encodings()] == [c4]
+    assert json.loads(json.dumps(c, cls=plotly.utils.PlotlyJSONEncoder)) == expected
+
+
+def test_debc031_props_check():
+    from dash.development.base_component import props_check
+
+    with props_check(False):
+        c = Component(id=1, unknown="value", a=Component(id="child"))
+        with props_check():
+            with pytest.raises(TypeError):
+                Component(unknown="value")
+    assert c.unknown == "value"
+    assert c.to_plotly_json()["props"] == {"id": 1, "a": c.a}
+
+    with pytest.raises(TypeError):
+        Component(id=1)
+
+
+def test_debc032_id_index():
+    c, c1, c2, c3, c4, c5 = nested_tree()
+    assert c["0.1.x.x.0"] is c1
+    assert "_id_index" in vars(c)
+
+    # Changes by the mapping interface keep the index
+    index = vars(c)["_id_index"]
+    del c["0.0"]
+    assert c["0.1.x.x.0"] is c1 and c["0.1"] is c4
+    new = Component(id="new", children=[Component(id={"type": "item", "index": 1})])
+    c["0.1.x.x.0"] = new
+    assert c2.children[3] is new
+    assert c[{"index": 1, "type": "item"}] is new.children[0]
+    assert vars(c)["_id_index"] is index
+    with pytest.raises(KeyError):
+        c["0.1.x.x.0"]
+
+    # Changes made without the mapping interface are found
+    c2.children = [Component(id="direct")]
+    assert c["direct"] is c2.children[0]
+    with pytest.raises(KeyError):
+        c["new"]
+    c3.children = Component(id="0.1.x.x", children=Component(id="moved"))
+    assert c["moved"] is c3.children.children
+    c4.id = "renamed"
+    assert c["renamed"] is c4
+    with pytest.raises(KeyError):
+        c["0.1"]
+
+    # The first of the components with the same ID, as without the index
+    first, second = Component(id="same"), Component(id="same", children=Component(id="inner"))
+    c.children = [Component(children=first), second]
+    assert c["same"] is first
+    del c["same"]
+    assert c["same"] is second
+    c["inner"] = Component(id="same")
+    assert c["same"] is second
+
+    # The unhashable IDs are searched
+    unhashable = Component()
+    unhashable.id = {"type": ["a"]}
+    c.children = [unhashable]
+    assert c[{"type": ["a"]}] is unhashable
+
+
+def test_debc033_walk():
+    c, c1, c2, c3, c4, c5 = nested_tree()
+    paths = dict((id(item), path) for path, item in c._traverse_with_paths())
+    assert paths[id(c5)] == "[0] Component (id=0.0)"
+    assert paths[id(c1)] == "\n".join(
+        [
+            "[1] Component (id=0.1)",
+            "[*] Component (id=0.1.x)",
+            "[*] Component (id=0.1.x.x)",
+            "[3] Component (id=0.1.x.x.0)",
+        ]
+    )
+    trails = list(c._walk())
+    assert [trail[0] for trail in trails] == list(c._traverse())
+    assert c._format_path(trails[-1]) == paths[id(c2.children[-1])]
+
+    # Deeper than the recursion limit
+    deep = Component(children="leaf")
+    for _ in range(5000):
+        deep = Component(children=[deep, "text"])
+    assert len(deep) == 10001
+    assert len(list(deep._traverse())) == 10000
+
+
+def test_debc034_clone_with(mocker):
+    from dash._utils import to_json
+
+    c, c1, c2, c3, c4, c5 = nested_tree()
+    expected = json.loads(to_json(c))
+    assert template(c) is c
+
+    clone = clone_with(c, {"0.1.x.x.0": {"children": "changed"}, "0.0": {"a": 1}}, {"style": {"color": "red"}})
+    assert clone is not c and clone.style == {"color": "red"}
+    assert not hasattr(c, "style")
+    # The changed components and their ancestors are copied
+    copied = [clone.children[0], clone["0.1"], clone["0.1.x"], clone["0.1.x.x"], clone["0.1.x.x.0"]]
+    assert [x.id for x in copied] == ["0.0", "0.1", "0.1.x", "0.1.x.x", "0.1.x.x.0"]
+    assert not any(x is y for x, y in zip(copied, [c5, c4, c3, c2, c1]))
+    assert clone["0.1.x.x.0"].children == "changed" and clone["0.0"].a == 1
+    assert c1.children == "string" and not hasattr(c5, "a")
+    assert json.loads(to_json(c)) == expected
+    # The copies can be changed, their lists of children are their own
+    clone["0.1.x.x"].children.append("more")
+    assert c2.children[-1] == 4.51
+
+    # The unchanged components are shared with their JSON
+    c2_copy = clone_with(c, {"0.1": {"a": 2}})
+    assert c2_copy["0.1.x"] is c3
+    spy = mocker.spy(Component, "_to_plotly_json_tree")
+    to_json(c2_copy)
+    to_json(clone_with(c2_copy, props={"a": 3}))
+    assert [call[0][0] for call in spy.call_args_list if call[1] == {"keep_frozen": False}] == [c5, c3]
+    expected["props"]["children"][1]["props"]["a"] = 2
+    assert json.loads(to_json(c2_copy)) == expected
+
+    # The children replaced by a change are kept over the copied ones
+    replaced = clone_with(c, {"0.1": {"children": "text"}, "0.1.x.x.0": {"children": "lost"}})
+    assert replaced["0.1"].children == "text"
+
+    with pytest.raises(KeyError):
+        clone_with(c, {"0.1": {"a": 1}, "missing": {"a": 1}})
+    with pytest.raises(TypeError):
+        clone_with(c, {"0.1": {"unknown": 1}})
+
+
+def test_debc035_clone_with_slots():
+    table = html.Table([html.Tr([html.Td("cell", id="cell", className="c")]) for _ in range(3)], id="t")
+    template(table)
+    clone = clone_with(table, {"cell": {"children": "changed"}}, {"title": "copy"})
+    assert type(clone) is html.Table and clone.title == "copy" and clone.id == "t"
+    assert type(clone["cell"]) is html.Td and clone["cell"].className == "c"
+    assert clone["cell"].children == "changed" and table["cell"].children == "cell"
+    assert clone.children[1] is table.children[1]
+
+
+def test_debc037_template_props():
+    from dash._utils import to_json
+
+    class TemplateComponent(Component):
+        _prop_names = ("id", "template", "clone_with", "freeze")
+
+    c = TemplateComponent(id="a", template="plotly", clone_with="b")
+    assert c.to_plotly_json()["props"] == {"id": "a", "template": "plotly", "clone_with": "b"}
+    clone = clone_with(template(c), props={"template": "seaborn"})
+    assert clone.template == "seaborn" and c.template == "plotly"
+    assert json.loads(to_json(clone))["props"] == {"id": "a", "template": "seaborn", "clone_with": "b"}
+    assert "template" in repr(c)
+
+
+def test_debc036_copy_frozen():
+    import copy
+    import pickle
+
+    from dash._utils import to_json
+
+    table = freeze(html.Table([html.Tr([html.Td("cell", id="cell", style={"color": "red"})])], id="t"))
+    for restored in (copy.deepcopy(table), pickle.loads(pickle.dumps(table)), copy.copy(table)):
+        assert restored is not table and type(restored) is type(table)
+        assert to_json(restored) == to_json(table)
+        assert isinstance(restored.children, tuple) and restored["cell"].style == {"color": "red"}
+        # Still frozen
+        with pytest.raises(AttributeError):
+            restored.id = "changed"
+        with pytest.raises(AttributeError):
+            restored["cell"].id = "changed"
+    assert copy.deepcopy(table)["cell"] is not table["cell"]
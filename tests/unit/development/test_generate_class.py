@@ -6,6 +6,7 @@ from difflib import unified_diff
 import pytest
 
 from dash.development._py_components_generation import generate_class
+from dash.development.base_component import Component
 from dash.development.component_generator import reserved_words
 from . import _dir, expected_table_component_doc
 
@@ -145,3 +146,32 @@ def test_attrs_match_forbidden_props(component_class):
         "id",
         "optionalArray",
     }, "explicit props were added as attrs"
+
+
+def test_props_slots(component_class):
+    assert "_prop_names" in vars(component_class)
+    assert "id" in component_class.__slots__
+    assert "data-*" not in component_class.__slots__
+
+    c = component_class("children", id="c", **{"data-x": 1})
+    # Only the wildcard attributes are in the instance dict
+    assert vars(c) == {"data-x": 1}
+    assert c.to_plotly_json()["props"] == {"children": "children", "id": "c", "data-x": 1}
+
+    del c.id
+    assert not hasattr(c, "id")
+    assert c.to_plotly_json()["props"] == {"children": "children", "data-x": 1}
+
+
+def test_constructor_errors_formatted_lazily(component_class, mocker):
+    spy = mocker.spy(Component, "_error_string_prefix")
+    c = component_class("children", id="c", optionalArray=[1], **{"data-x": 1})
+    assert c.optionalArray == [1] and not hasattr(c, "optionalBool")
+    assert spy.call_count == 0
+
+    with pytest.raises(TypeError) as error:
+        component_class(id="c", unknown=1)
+    assert 'The `Table` component with the ID "c" received an unexpected keyword argument: `unknown`' in str(
+        error.value
+    )
+    assert spy.call_count == 1
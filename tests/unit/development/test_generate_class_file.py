@@ -15,7 +15,7 @@ from . import _dir, has_trailing_space
 import_string = (
     "# AUTO GENERATED FILE - DO NOT EDIT\n\n"
     + "from dash.development.base_component import"
-    + " Component, _explicitize_args\n\n\n"
+    + " Component\n\n\n"
 )
 
 